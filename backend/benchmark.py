@@ -0,0 +1,188 @@
+"""週次パイプラインのオフライン・エンドツーエンドベンチマーク
+
+ローカルの Google API 代替サーバー（backend.fake_google_api）を起動し、
+一時ディレクトリに作ったプロジェクトルートで run_weekly を実行して時間を計る。
+候補プールの件数ごとに1回ずつ（--repeat で複数回）、キャッシュが空の状態から実行する。
+API クォータは消費せず、メール送信と Google Sheets 同期は無効にする。
+
+    python -m backend.benchmark                              # 候補 100 / 300 / 1000 件
+    python -m backend.benchmark --pool-sizes 200,2000 --latency-ms 80 --jitter-ms 40
+    python -m backend.benchmark --output bench.json          # 結果を JSON で保存
+
+各実行のステップ別の内訳は、実行が書き出した計測レポート（backend.metrics）から取る。
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+from backend.config import CONFIG_FILE, DATA_DIR, FRONTEND_DATA_DIR, PROJECT_ROOT
+from backend.fake_google_api import (
+    PLACES_PER_QUERY,
+    FakeGoogleApi,
+    build_place_pool,
+    load_image_fixtures,
+    load_station_fixtures,
+)
+from backend.site_generator import load_archive_weeks
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZES = "100,300,1000"
+
+# 一時ルートにコピーする data/ のファイル（訪問済み・推薦履歴による除外を本番と揃える）
+COPIED_DATA_FILES = ["visited.json", "history.json"]
+
+
+def _prepare_root(root: Path, pool_size: int) -> None:
+    """ベンチマーク用のプロジェクトルートを作る。"""
+    with open(CONFIG_FILE, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+
+    # 検索クエリ "bench-{i}" が候補プールを 60件ずつ返す
+    config["search"]["queries"] = [
+        f"bench-{i}" for i in range(math.ceil(pool_size / PLACES_PER_QUERY))
+    ]
+    config["search"]["refresh_queries_per_run"] = 0
+    config["email"]["recipients"] = []
+    config["sheets"]["spreadsheet_id"] = ""
+
+    with open(root / "config.yaml", "w", encoding="utf-8") as f:
+        yaml.safe_dump(config, f, allow_unicode=True, sort_keys=False)
+
+    (root / "data").mkdir()
+    for name in COPIED_DATA_FILES:
+        if (DATA_DIR / name).exists():
+            shutil.copy2(DATA_DIR / name, root / "data" / name)
+    frontend_data = root / FRONTEND_DATA_DIR.relative_to(PROJECT_ROOT)
+    shutil.copytree(FRONTEND_DATA_DIR, frontend_data)
+    (frontend_data.parent / "photos").mkdir()
+
+
+def _run_once(api: FakeGoogleApi, pool_size: int, keep: bool) -> dict:
+    """一時ルートで run_weekly を1回実行し、結果をまとめる。"""
+    root = Path(tempfile.mkdtemp(prefix=f"gourmet-bench-{pool_size}-"))
+    try:
+        _prepare_root(root, pool_size)
+        env = {
+            **os.environ,
+            "TOKYO_GOURMET_ROOT": str(root),
+            "PLACES_API_BASE_URL": api.places_base_url,
+            "ROUTES_API_BASE_URL": api.routes_base_url,
+            "GOOGLE_API_KEY": "benchmark",
+        }
+        api.request_counts.clear()
+
+        started = time.perf_counter()
+        with open(root / "run.log", "w", encoding="utf-8") as log:
+            proc = subprocess.run(
+                [sys.executable, "-m", "backend.run_weekly"],
+                cwd=PROJECT_ROOT,
+                env=env,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+            )
+        wall_seconds = time.perf_counter() - started
+
+        reports = sorted((root / "data" / "metrics").glob("*.json"))
+        report = {}
+        if reports:
+            with open(reports[-1], "r", encoding="utf-8") as f:
+                report = json.load(f)
+
+        result = {
+            "pool_size": pool_size,
+            "exit_code": proc.returncode,
+            "wall_seconds": round(wall_seconds, 3),
+            "stage_seconds": {
+                name: stage["wall_seconds"] for name, stage in report.get("stages", {}).items()
+            },
+            "http_calls": {
+                endpoint: stats["calls"]
+                for endpoint, stats in report.get("totals", {}).get("http", {}).items()
+            },
+            "server_requests": dict(api.request_counts),
+        }
+        if proc.returncode != 0:
+            logger.warning(f"run_weekly が失敗しました (exit {proc.returncode}): {root / 'run.log'}")
+            keep = True
+        if keep:
+            result["root"] = str(root)
+        return result
+    finally:
+        if not keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+def main() -> int:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        datefmt="%H:%M:%S",
+    )
+    parser = argparse.ArgumentParser(description="週次パイプラインのオフラインベンチマーク")
+    parser.add_argument(
+        "--pool-sizes",
+        default=DEFAULT_POOL_SIZES,
+        help=f"候補プールの件数（カンマ区切り、既定: {DEFAULT_POOL_SIZES}）",
+    )
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="API の基本遅延（ミリ秒）")
+    parser.add_argument("--jitter-ms", type=float, default=30.0, help="遅延に加えるランダム幅（ミリ秒）")
+    parser.add_argument("--repeat", type=int, default=1, help="各件数での実行回数")
+    parser.add_argument("--seed", type=int, default=0, help="候補の複製・遅延の乱数シード")
+    parser.add_argument("--output", type=Path, default=None, help="結果 JSON の出力先")
+    parser.add_argument("--keep", action="store_true", help="実行に使った一時ディレクトリを残す")
+    args = parser.parse_args()
+
+    pool_sizes = [int(s) for s in args.pool_sizes.split(",") if s.strip()]
+    archive_weeks = load_archive_weeks()
+    stations = load_station_fixtures()
+    images = load_image_fixtures()
+
+    results = []
+    for pool_size in pool_sizes:
+        api = FakeGoogleApi(
+            build_place_pool(archive_weeks, pool_size, seed=args.seed),
+            stations,
+            images,
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            seed=args.seed,
+        )
+        api.start()
+        try:
+            for i in range(args.repeat):
+                result = _run_once(api, pool_size, args.keep)
+                results.append(result)
+                logger.info(
+                    f"候補 {pool_size}件 ({i + 1}/{args.repeat}): {result['wall_seconds']:.1f}秒, "
+                    f"API {sum(result['http_calls'].values())}回 (exit {result['exit_code']})"
+                )
+        finally:
+            api.stop()
+
+    summary = {
+        "latency_ms": args.latency_ms,
+        "jitter_ms": args.jitter_ms,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        logger.info(f"結果出力: {args.output}")
+    else:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 0 if all(r["exit_code"] == 0 for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
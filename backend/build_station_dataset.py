@@ -0,0 +1,100 @@
+"""オフライン最寄り駅検索用の駅データセットを生成するメンテナンススクリプト。
+
+駅データ.jp（https://ekidata.jp/）の駅データ CSV と路線データ CSV から、
+首都圏（埼玉・千葉・東京・神奈川）の営業中の駅を抜き出して
+data/stations.csv（name, line, lat, lng）に書き出す。
+乗り入れ路線ごとに1行ずつ出力する。
+
+使い方:
+    python -m backend.build_station_dataset --stations station20240426free.csv \\
+        --lines line20240426free.csv
+    python -m backend.build_station_dataset ... --prefs 13      # 東京都のみ
+
+data/stations.csv がない場合、週次ワークフローがリポジトリ変数
+EKIDATA_STATIONS_URL / EKIDATA_LINES_URL の CSV から生成してコミットする。
+"""
+import argparse
+import csv
+import logging
+import sys
+from pathlib import Path
+
+from backend.config import STATIONS_FILE
+from backend.station_locator import STATION_FIELDS
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    datefmt="%H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+# 都道府県コード: 埼玉・千葉・東京・神奈川
+DEFAULT_PREFS = "11,12,13,14"
+
+
+def _read_csv(path: Path) -> list[dict]:
+    # 駅データ.jp の CSV は BOM 付き UTF-8 の場合がある
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="駅データセットを生成する")
+    parser.add_argument("--stations", type=Path, required=True, help="駅データ CSV")
+    parser.add_argument("--lines", type=Path, required=True, help="路線データ CSV")
+    parser.add_argument(
+        "--prefs",
+        default=DEFAULT_PREFS,
+        help=f"対象の都道府県コード（カンマ区切り、既定: {DEFAULT_PREFS}）",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=STATIONS_FILE,
+        help=f"出力先（既定: {STATIONS_FILE}）",
+    )
+    args = parser.parse_args()
+
+    prefs = {p.strip() for p in args.prefs.split(",") if p.strip()}
+
+    line_names = {
+        row["line_cd"]: row["line_name"]
+        for row in _read_csv(args.lines)
+        if row.get("e_status", "0") == "0"
+    }
+
+    rows = []
+    for row in _read_csv(args.stations):
+        # e_status: 0=運用中 1=運用前 2=廃止
+        if row.get("e_status", "0") != "0" or row.get("pref_cd") not in prefs:
+            continue
+        line = line_names.get(row.get("line_cd", ""))
+        if line is None:
+            continue
+        try:
+            lat, lng = float(row["lat"]), float(row["lon"])
+        except (KeyError, ValueError):
+            continue
+        name = row["station_name"]
+        # Places API の表示名に合わせて「駅」を付ける
+        if not name.endswith("駅"):
+            name += "駅"
+        rows.append({"name": name, "line": line, "lat": lat, "lng": lng})
+
+    if not rows:
+        logger.error("対象の駅が0件です。入力ファイルと --prefs を確認してください。")
+        return 1
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=STATION_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    logger.info(f"駅データセット生成: {len(rows)}件 → {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
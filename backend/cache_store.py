@@ -0,0 +1,199 @@
+"""追記型ログ（JSON Lines）による永続キャッシュストア
+
+1行1エントリの JSON を追記していき、起動時に1回だけ読み込んで
+メモリ上の辞書でポイント参照する。同じキーを何度も書き換えて
+ログが肥大化した場合は、読み込み時に最新値だけの形へ圧縮（コンパクション）する。
+
+data/ 配下は毎週 git にコミットされるため、バイナリの DB ではなく
+差分が行単位で読めるテキスト形式を採用している。
+
+ログの各行:
+    {"k": "<key>", "v": <value>}   値の登録・上書き
+    {"k": "<key>", "d": true}      削除
+"""
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+logger = logging.getLogger(__name__)
+
+# ログ行数がライブキー数のこの倍数を超えたらコンパクションする
+COMPACT_RATIO = 2.0
+# 小さなログはコンパクションしない
+COMPACT_MIN_LINES = 200
+
+_stores: dict[Path, "CacheStore"] = {}
+_stores_lock = threading.Lock()
+
+
+class CacheStore:
+    """キー → JSON 値の永続キャッシュ。
+
+    - 読み込みはインスタンス生成時の1回のみ（以降はメモリ上で参照）
+    - put() は即座にログへ追記する。batch() の中では抜けるときにまとめて追記する
+    - スレッドセーフ
+    """
+
+    def __init__(self, path: Path, legacy_json: Path | None = None):
+        self.path = Path(path)
+        self._data: dict[str, Any] = {}
+        self._pending: list[dict] = []
+        self._batch_depth = 0
+        self._lock = threading.RLock()
+
+        if not self.path.exists() and legacy_json is not None and legacy_json.exists():
+            self._migrate_from_json(legacy_json)
+        else:
+            self._load()
+
+    # --- 参照 -------------------------------------------------------------
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            return self._data.get(key, default)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def items(self) -> list[tuple[str, Any]]:
+        """全エントリのスナップショットを返す。"""
+        with self._lock:
+            return list(self._data.items())
+
+    # --- 更新 -------------------------------------------------------------
+
+    def put(self, key: str, value: Any) -> None:
+        """値を登録する（batch() 外では即座にログへ追記）。"""
+        with self._lock:
+            self._data[key] = value
+            self._pending.append({"k": key, "v": value})
+            if self._batch_depth == 0:
+                self._flush_locked()
+
+    def put_many(self, items: dict[str, Any]) -> None:
+        """複数の値をまとめて登録する。"""
+        with self.batch():
+            for key, value in items.items():
+                self.put(key, value)
+
+    def delete(self, key: str) -> None:
+        """エントリを削除する。"""
+        with self._lock:
+            if key not in self._data:
+                return
+            del self._data[key]
+            self._pending.append({"k": key, "d": True})
+            if self._batch_depth == 0:
+                self._flush_locked()
+
+    @contextmanager
+    def batch(self) -> Iterator["CacheStore"]:
+        """with ブロック内の更新を1回の追記にまとめる。"""
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self._flush_locked()
+
+    def flush(self) -> None:
+        """未書き込みの更新をログへ追記する。"""
+        with self._lock:
+            self._flush_locked()
+
+    def compact(self) -> None:
+        """ログを現在の値だけの形に書き直す。"""
+        with self._lock:
+            self._pending.clear()
+            self._rewrite_locked()
+
+    # --- 内部処理 -----------------------------------------------------------
+
+    def _flush_locked(self) -> None:
+        if not self._pending:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for record in self._pending:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._pending.clear()
+
+    def _rewrite_locked(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for key, value in self._data.items():
+                f.write(json.dumps({"k": key, "v": value}, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def _load(self) -> None:
+        try:
+            f = open(self.path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return
+
+        lines = 0
+        with f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 書き込み途中で中断した行は読み飛ばす
+                    logger.warning(f"キャッシュログの壊れた行を無視します: {self.path.name}")
+                    continue
+                lines += 1
+                key = record.get("k")
+                if key is None:
+                    continue
+                if record.get("d"):
+                    self._data.pop(key, None)
+                else:
+                    self._data[key] = record.get("v")
+
+        if lines >= COMPACT_MIN_LINES and lines > len(self._data) * COMPACT_RATIO:
+            logger.info(
+                f"キャッシュログを圧縮: {self.path.name} ({lines}行 → {len(self._data)}行)"
+            )
+            self._rewrite_locked()
+
+    def _migrate_from_json(self, legacy_json: Path) -> None:
+        try:
+            with open(legacy_json, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+        except json.JSONDecodeError as e:
+            logger.warning(f"旧キャッシュの読み込みに失敗したため移行しません: {e}")
+            return
+
+        self._data = dict(legacy)
+        self._rewrite_locked()
+        # 移行後は読まないので旧ファイルは削除する
+        legacy_json.unlink()
+        logger.info(
+            f"旧キャッシュを移行: {legacy_json.name} → {self.path.name} ({len(self._data)}件)"
+        )
+
+
+def get_store(path: Path, legacy_json: Path | None = None) -> CacheStore:
+    """パスごとに1プロセス1インスタンスの CacheStore を返す。"""
+    key = Path(path).resolve()
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = CacheStore(path, legacy_json=legacy_json)
+            _stores[key] = store
+        return store
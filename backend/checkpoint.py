@@ -0,0 +1,68 @@
+"""週次パイプラインのステップごとのチェックポイント
+
+各ステップの出力を data/checkpoints/<run_id>/<step>.json に保存し、
+--resume で実行し直したときは完了済みのステップを読み込んで飛ばす。
+run_id は実行週（ISO 週番号）で、同じ週の再実行だけが途中から再開される。
+パイプラインが最後まで完了したらディレクトリごと削除する。
+"""
+import json
+import logging
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from backend.config import CHECKPOINT_DIR
+
+logger = logging.getLogger(__name__)
+
+
+def run_id_for(now: datetime) -> str:
+    """実行週の ID（例: "2026-W42"）を返す。"""
+    year, week, _ = now.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+class RunCheckpoint:
+    """1回の週次実行のチェックポイント。"""
+
+    def __init__(self, run_id: str, resume: bool = False, root: Path = CHECKPOINT_DIR):
+        self.run_id = run_id
+        self.dir = root / run_id
+        if not resume and self.dir.exists():
+            shutil.rmtree(self.dir)
+        # 過去の週の中断した実行は再開しないので削除する
+        if root.exists():
+            for stale in root.iterdir():
+                if stale.is_dir() and stale.name != run_id:
+                    shutil.rmtree(stale, ignore_errors=True)
+        self.dir.mkdir(parents=True, exist_ok=True)
+
+        completed = sorted(p.stem for p in self.dir.glob("*.json"))
+        if completed:
+            logger.info(f"チェックポイントから再開: {run_id}（完了済み: {', '.join(completed)}）")
+
+    def _path(self, step: str) -> Path:
+        return self.dir / f"{step}.json"
+
+    def completed(self, step: str) -> bool:
+        """ステップが完了済みか。"""
+        return self._path(step).exists()
+
+    def load(self, step: str) -> Any:
+        """完了済みステップの出力を読み込む。"""
+        with open(self._path(step), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save(self, step: str, data: Any) -> None:
+        """ステップの出力を保存する（途中で中断されても壊れないよう置き換えで書く）。"""
+        path = self._path(step)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def clear(self) -> None:
+        """完了した実行のチェックポイントを削除する。"""
+        shutil.rmtree(self.dir, ignore_errors=True)
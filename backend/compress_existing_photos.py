@@ -4,17 +4,29 @@ frontend/public/photos 配下の .jpg をすべて読み込み、
 config.yaml の photos 設定（target_width_px / jpeg_quality）に従って再圧縮し、
 その場で上書き保存する。
 
+処理したファイルは data/photo_compress_manifest.jsonl に
+（target_width_px, jpeg_quality, 内容ハッシュ）を記録し、次回以降は
+設定が変わらない限りデコードせずにスキップする。
+
 使い方:
     python -m backend.compress_existing_photos          # 実行
     python -m backend.compress_existing_photos --dry-run  # 集計のみ（書き込まない）
+    python -m backend.compress_existing_photos --jobs 4   # 4プロセスで並列実行
+    python -m backend.compress_existing_photos --force    # 処理済みも含めて全件処理
 
 実行前に必ずバックアップを取ること（このスクリプトは上書きする）。
 """
 import argparse
+import hashlib
 import logging
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 
-from backend.config import PHOTOS_DIR, load_config
+from backend.cache_store import CacheStore, get_store
+from backend.config import (
+    PHOTOS_DIR, PHOTO_COMPRESS_MANIFEST_FILE, PHOTO_MANIFEST_FILE, load_config,
+)
 from backend.photo_downloader import compress_image
 
 logging.basicConfig(
@@ -25,6 +37,87 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _process_file(
+    filepath: Path,
+    target_width: int,
+    quality: int,
+    dry_run: bool,
+) -> dict:
+    """1ファイルを再圧縮する（ワーカープロセスで実行）。
+
+    Returns:
+        {"name", "before", "after", "rewritten", "sha256", "error"}
+    """
+    try:
+        original = filepath.read_bytes()
+    except Exception as e:
+        return {"name": filepath.name, "error": str(e)}
+
+    compressed = compress_image(original, target_width=target_width, quality=quality)
+
+    # 圧縮で逆に大きくなる場合は元を維持
+    if len(compressed) >= len(original):
+        final, rewritten = original, False
+    else:
+        final, rewritten = compressed, True
+        if not dry_run:
+            filepath.write_bytes(compressed)
+
+    return {
+        "name": filepath.name,
+        "before": len(original),
+        "after": len(final),
+        "rewritten": rewritten,
+        "sha256": hashlib.sha256(final).hexdigest(),
+        "error": None,
+    }
+
+
+def _is_compliant(
+    filepath: Path,
+    entry: dict | None,
+    target_width: int,
+    quality: int,
+) -> bool:
+    """マニフェストの記録から、デコードせずに処理済みかどうかを判定する。
+
+    圧縮設定が一致し、サイズ・更新時刻が記録どおりなら処理済み。
+    更新時刻だけ異なる場合（チェックアウトし直した等）は内容ハッシュで確認する。
+    """
+    if not entry:
+        return False
+    if entry.get("target_width") != target_width or entry.get("jpeg_quality") != quality:
+        return False
+    stat = filepath.stat()
+    if stat.st_size != entry.get("size"):
+        return False
+    if stat.st_mtime_ns == entry.get("mtime_ns"):
+        return True
+    return _sha256_file(filepath) == entry.get("sha256")
+
+
+def _sha256_file(filepath: Path) -> str:
+    return hashlib.sha256(filepath.read_bytes()).hexdigest()
+
+
+def _record(
+    manifest: CacheStore,
+    filepath: Path,
+    sha256: str,
+    target_width: int,
+    quality: int,
+) -> None:
+    """処理済みとしてマニフェストに記録する。"""
+    stat = filepath.stat()
+    manifest.put(filepath.name, {
+        "target_width": target_width,
+        "jpeg_quality": quality,
+        "sha256": sha256,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    })
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="既存写真を一括再圧縮する")
     parser.add_argument(
@@ -32,6 +125,17 @@ def main() -> int:
         action="store_true",
         help="書き込まずに削減見込みだけ表示する",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="並列プロセス数（既定: 1）",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="処理済みマニフェストを無視して全ファイルを処理する",
+    )
     args = parser.parse_args()
 
     config = load_config()
@@ -43,8 +147,37 @@ def main() -> int:
         logger.error(f"写真ディレクトリが見つかりません: {PHOTOS_DIR}")
         return 1
 
+    manifest = get_store(PHOTO_COMPRESS_MANIFEST_FILE)
+
+    # photo_downloader が同じ設定で保存した写真（縮小版の JPEG バリアントを含む）も
+    # 処理済みとみなす。値は内容の SHA-256（バリアントはファイル名の内容ハッシュ接頭辞）
+    downloaded = {}
+    for _, entry in get_store(PHOTO_MANIFEST_FILE).items():
+        if (entry.get("target_width") == target_width
+                and entry.get("jpeg_quality") == quality):
+            downloaded[entry.get("filename")] = entry.get("sha256")
+            for variant in entry.get("variants", []):
+                if variant["format"] == "jpeg" and variant["filename"] not in downloaded:
+                    downloaded[variant["filename"]] = variant["filename"].split(".")[0]
+
     files = sorted(PHOTOS_DIR.glob("*.jpg"))
-    logger.info(f"対象: {len(files)}枚 / target_width={target_width}px quality={quality}")
+    todo = []
+    for filepath in files:
+        if args.force:
+            todo.append(filepath)
+        elif _is_compliant(filepath, manifest.get(filepath.name), target_width, quality):
+            continue
+        elif (filepath.name in downloaded
+                and (sha256 := _sha256_file(filepath)).startswith(downloaded[filepath.name])):
+            if not args.dry_run:
+                _record(manifest, filepath, sha256, target_width, quality)
+        else:
+            todo.append(filepath)
+
+    logger.info(
+        f"対象: {len(todo)}枚（処理済みスキップ: {len(files) - len(todo)}枚）"
+        f" / target_width={target_width}px quality={quality} jobs={args.jobs}"
+    )
     if args.dry_run:
         logger.info("[DRY-RUN] ファイルは書き換えません")
 
@@ -52,28 +185,40 @@ def main() -> int:
     total_after = 0
     skipped = 0
 
-    for i, filepath in enumerate(files, 1):
-        try:
-            original = filepath.read_bytes()
-        except Exception as e:
-            logger.warning(f"読み込み失敗 ({filepath.name}): {e}")
-            skipped += 1
-            continue
-
-        compressed = compress_image(original, target_width=target_width, quality=quality)
-        total_before += len(original)
-
-        # 圧縮で逆に大きくなる場合は元を維持
-        if len(compressed) >= len(original):
-            total_after += len(original)
-            skipped += 1
-        else:
-            total_after += len(compressed)
-            if not args.dry_run:
-                filepath.write_bytes(compressed)
-
-        if i % 100 == 0 or i == len(files):
-            logger.info(f"  {i}/{len(files)} 処理済み")
+    if args.jobs > 1:
+        executor = ProcessPoolExecutor(max_workers=args.jobs)
+        results = executor.map(
+            _process_file,
+            todo,
+            [target_width] * len(todo),
+            [quality] * len(todo),
+            [args.dry_run] * len(todo),
+            chunksize=8,
+        )
+    else:
+        executor = None
+        results = (_process_file(f, target_width, quality, args.dry_run) for f in todo)
+
+    try:
+        with manifest.batch():
+            for i, (filepath, result) in enumerate(zip(todo, results), 1):
+                if result["error"]:
+                    logger.warning(f"読み込み失敗 ({result['name']}): {result['error']}")
+                    skipped += 1
+                    continue
+
+                total_before += result["before"]
+                total_after += result["after"]
+                if not result["rewritten"]:
+                    skipped += 1
+                if not args.dry_run:
+                    _record(manifest, filepath, result["sha256"], target_width, quality)
+
+                if i % 100 == 0 or i == len(todo):
+                    logger.info(f"  {i}/{len(todo)} 処理済み")
+    finally:
+        if executor is not None:
+            executor.shutdown()
 
     mb = 1024 * 1024
     reduction = (1 - total_after / total_before) * 100 if total_before else 0
@@ -4,8 +4,8 @@ from pathlib import Path
 
 import yaml
 
-# プロジェクトルート
-PROJECT_ROOT = Path(__file__).parent.parent
+# プロジェクトルート（ベンチマークでは TOKYO_GOURMET_ROOT で一時ディレクトリに差し替える）
+PROJECT_ROOT = Path(os.environ.get("TOKYO_GOURMET_ROOT") or Path(__file__).parent.parent)
 CONFIG_FILE = PROJECT_ROOT / "config.yaml"
 
 # データディレクトリ
@@ -16,7 +16,20 @@ PHOTOS_DIR = PROJECT_ROOT / "frontend" / "public" / "photos"
 # データファイル
 VISITED_FILE = DATA_DIR / "visited.json"
 HISTORY_FILE = DATA_DIR / "history.json"
-STATION_CACHE_FILE = DATA_DIR / "station_cache.json"
+HISTORY_INDEX_FILE = DATA_DIR / "history_index.json"
+STATION_CACHE_FILE = DATA_DIR / "station_cache.json"  # 旧形式（移行元）
+CACHE_STORE_FILE = DATA_DIR / "station_cache.jsonl"
+PHOTO_MANIFEST_FILE = DATA_DIR / "photo_manifest.jsonl"
+PHOTO_COMPRESS_MANIFEST_FILE = DATA_DIR / "photo_compress_manifest.jsonl"
+STATIONS_FILE = DATA_DIR / "stations.csv"
+PLACE_CATALOG_FILE = DATA_DIR / "place_catalog.jsonl"
+DETAILS_CACHE_FILE = DATA_DIR / "details_cache.jsonl"
+CHECKPOINT_DIR = DATA_DIR / "checkpoints"
+METRICS_DIR = DATA_DIR / "metrics"
+
+# Google API のベース URL（ベンチマークではローカルの代替サーバーに向ける）
+PLACES_API_BASE_URL = os.environ.get("PLACES_API_BASE_URL", "https://places.googleapis.com/v1")
+ROUTES_API_BASE_URL = os.environ.get("ROUTES_API_BASE_URL", "https://routes.googleapis.com")
 
 # 認証
 CREDENTIALS_DIR = Path(os.environ.get(
@@ -0,0 +1,380 @@
+"""ベンチマーク用のローカル Google API 代替サーバー
+
+Places API (New) と Routes API のうち、パイプラインが使う以下を模倣する。
+    POST /v1/places:searchText
+    GET  /v1/places/{id}                       （レストラン・駅の Place Details）
+    GET  /v1/places/{id}/photos/{n}/media      （写真）
+    POST /v1/places:searchNearby               （最寄り駅）
+    POST /directions/v2:computeRoutes
+    POST /distanceMatrix/v2:computeRouteMatrix
+
+レストランはアーカイブの推薦済みレストランから Places API 形式に組み立て、
+候補数が足りない場合は座標をずらした複製で水増しする。
+駅は駅キャッシュ（station_cache）の "station:lat,lng" エントリ、写真は
+frontend/public/photos の既存ファイルを使う。経路は直線距離から計算する。
+各リクエストには latency_ms + 0〜jitter_ms のランダムな遅延を入れる。
+
+検索クエリ "bench-{i}" は候補プールの i 番目の 60件（20件 × 3ページ）を返す。
+"""
+import io
+import json
+import logging
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from PIL import Image
+
+from backend.config import CACHE_STORE_FILE, PHOTOS_DIR
+from backend.geo import haversine_km
+
+logger = logging.getLogger(__name__)
+
+# 1クエリあたりの件数（searchText の 1ページ 20件 × 最大3ページ）
+PAGE_SIZE = 20
+PLACES_PER_QUERY = 60
+
+# 経路計算: 道路距離 = 直線距離 × ROAD_FACTOR、平均時速 DRIVE_KMH
+ROAD_FACTOR = 1.3
+DRIVE_KMH = 25
+
+# 写真として返す画像の最大数（メモリに読み込む）
+MAX_IMAGES = 32
+
+BUDGET_PRICE_LEVELS = {
+    "kosupa": "PRICE_LEVEL_INEXPENSIVE",
+    "average": "PRICE_LEVEL_MODERATE",
+    "premium": "PRICE_LEVEL_EXPENSIVE",
+}
+
+
+def _archive_place(r: dict) -> dict | None:
+    """アーカイブのレストラン1件を Places API の place 形式に戻す。"""
+    query = parse_qs(urlsplit(r.get("route_url", "")).query)
+    try:
+        lat, lng = (float(v) for v in query["destination"][0].split(","))
+    except (KeyError, ValueError):
+        return None
+
+    place_id = r["place_id"]
+    payment = r.get("payment_methods") or {}
+    place = {
+        "id": place_id,
+        "displayName": {"text": r["name"], "languageCode": "ja"},
+        "rating": r.get("rating"),
+        "userRatingCount": r.get("user_rating_count", 0),
+        "priceLevel": BUDGET_PRICE_LEVELS.get(r.get("budget_tier"), "PRICE_LEVEL_MODERATE"),
+        "formattedAddress": r.get("address", ""),
+        "location": {"latitude": lat, "longitude": lng},
+        "primaryType": r.get("primary_type", "restaurant"),
+        "primaryTypeDisplayName": {"text": r.get("genre", ""), "languageCode": "ja"},
+        "googleMapsUri": r.get("google_maps_url", ""),
+        "photos": [
+            {
+                "name": f"places/{place_id}/photos/{i}",
+                "authorAttributions": [{"displayName": p.get("attribution", "")}],
+            }
+            for i, p in enumerate(r.get("photos", []))
+        ],
+        "regularOpeningHours": {"weekdayDescriptions": r.get("opening_hours", [])},
+        "reservable": r.get("reservable"),
+        "websiteUri": r.get("website", ""),
+        "nationalPhoneNumber": r.get("phone", ""),
+        "reviews": [],
+        "paymentOptions": {
+            "acceptsCreditCards": payment.get("credit_card"),
+            "acceptsDebitCards": payment.get("debit_card"),
+            "acceptsCashOnly": payment.get("cash_only"),
+            "acceptsNfc": payment.get("nfc"),
+        },
+    }
+    if r.get("recommended_menu"):
+        place["reviews"].append({
+            "rating": r.get("recommended_menu_rating") or 5,
+            "text": {"text": r["recommended_menu"], "languageCode": "ja"},
+        })
+    return place
+
+
+def build_place_pool(archive_weeks: list[dict], size: int, seed: int = 0) -> list[dict]:
+    """アーカイブから size 件の候補プールを作る（足りない分は複製で補う）。"""
+    base = []
+    seen = set()
+    for week in archive_weeks:
+        for r in week.get("restaurants", []):
+            if r["place_id"] in seen:
+                continue
+            seen.add(r["place_id"])
+            place = _archive_place(r)
+            if place is not None:
+                base.append(place)
+    if not base:
+        raise ValueError("アーカイブに座標付きのレストランがありません")
+
+    rng = random.Random(seed)
+    pool = base[:size]
+    copy = 1
+    while len(pool) < size:
+        for place in base[:size - len(pool)]:
+            clone = json.loads(json.dumps(place))
+            clone["id"] = f"{place['id']}-b{copy}"
+            clone["displayName"]["text"] = f"{place['displayName']['text']} ({copy})"
+            clone["location"]["latitude"] += rng.uniform(-0.01, 0.01)
+            clone["location"]["longitude"] += rng.uniform(-0.01, 0.01)
+            clone["photos"] = [
+                {**p, "name": f"places/{clone['id']}/photos/{i}"}
+                for i, p in enumerate(clone["photos"])
+            ]
+            pool.append(clone)
+        copy += 1
+    return pool
+
+
+def _read_station_cache() -> dict:
+    """キャッシュストア（station_cache.jsonl）を読み込む。
+
+    実データのストアを開くとコンパクション等で書き換わる場合があるため、
+    CacheStore を使わずにログを読み取り専用で再生する。
+    """
+    cache = {}
+    if not CACHE_STORE_FILE.exists():
+        return cache
+    with open(CACHE_STORE_FILE, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("d"):
+                cache.pop(record["k"], None)
+            else:
+                cache[record["k"]] = record.get("v")
+    return cache
+
+
+def load_station_fixtures() -> list[tuple[float, float, str, str]]:
+    """駅キャッシュの "station:lat,lng" エントリを (lat, lng, 駅名, 路線名) のリストにする。"""
+    cache = _read_station_cache()
+
+    stations = []
+    for key, entry in cache.items():
+        if not key.startswith("station:") or not (entry or {}).get("name"):
+            continue
+        try:
+            lat, lng = (float(v) for v in key.split(":", 1)[1].split(","))
+        except ValueError:
+            continue
+        m = re.match(r"^(.*?)（(.*)）$", entry["name"])
+        name, line = (m.group(1), m.group(2)) if m else (entry["name"], "")
+        stations.append((lat, lng, name, line))
+    return stations
+
+
+def load_image_fixtures(directory: Path = PHOTOS_DIR) -> list[bytes]:
+    """写真として返す画像を読み込む（ない場合は単色の JPEG を1枚作る）。"""
+    images = [p.read_bytes() for p in sorted(directory.glob("*.jpg"))[:MAX_IMAGES]]
+    if not images:
+        buffer = io.BytesIO()
+        Image.new("RGB", (960, 720), (200, 120, 60)).save(buffer, format="JPEG", quality=85)
+        images = [buffer.getvalue()]
+    return images
+
+
+def _route(origin: dict, destination: dict) -> tuple[int, int]:
+    """waypoint 2点間の (走行秒数, 走行距離m) を直線距離から求める。"""
+    o = origin["location"]["latLng"]
+    d = destination["location"]["latLng"]
+    road_km = haversine_km(o["latitude"], o["longitude"], d["latitude"], d["longitude"]) * ROAD_FACTOR
+    return round(road_km / DRIVE_KMH * 3600), round(road_km * 1000)
+
+
+def _masked(obj: dict, field_mask: str, prefix: str = "") -> dict:
+    """フィールドマスクに含まれるトップレベルのフィールドだけを残す。"""
+    if field_mask.strip() == "*":
+        return obj
+    fields = {f.strip()[len(prefix):] for f in field_mask.split(",") if f.strip().startswith(prefix)}
+    return {k: v for k, v in obj.items() if k in fields}
+
+
+class FakeGoogleApi:
+    """Places / Routes API の代替サーバー。"""
+
+    def __init__(
+        self,
+        places: list[dict],
+        stations: list[tuple[float, float, str, str]],
+        images: list[bytes],
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        seed: int = 0,
+    ):
+        self.places = places
+        self.places_by_id = {p["id"]: p for p in places}
+        self.stations = stations
+        self.images = images
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.request_counts: dict[str, int] = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: ThreadingHTTPServer | None = None
+
+    @property
+    def places_base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/v1"
+
+    @property
+    def routes_base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self) -> None:
+        """バックグラウンドスレッドでサーバーを起動する（ポートは自動割り当て）。"""
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                api._handle(self, "GET")
+
+            def do_POST(self):
+                api._handle(self, "POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        logger.info(
+            f"代替 API サーバー起動: {self.routes_base_url} "
+            f"(候補 {len(self.places)}件, 駅 {len(self.stations)}件, "
+            f"遅延 {self.latency_ms:.0f}+{self.jitter_ms:.0f}ms)"
+        )
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _sleep_seconds(self) -> float:
+        with self._lock:
+            jitter = self._rng.uniform(0, self.jitter_ms) if self.jitter_ms > 0 else 0.0
+        return (self.latency_ms + jitter) / 1000
+
+    def _handle(self, handler: BaseHTTPRequestHandler, method: str) -> None:
+        path = urlsplit(handler.path).path
+        body = {}
+        if method == "POST":
+            length = int(handler.headers.get("Content-Length", 0))
+            body = json.loads(handler.rfile.read(length) or b"{}")
+        field_mask = handler.headers.get("X-Goog-FieldMask", "*")
+
+        time.sleep(self._sleep_seconds())
+
+        if path == "/v1/places:searchText":
+            endpoint, payload = "searchText", self._search_text(body, field_mask)
+        elif path == "/v1/places:searchNearby":
+            endpoint, payload = "searchNearby", self._search_nearby(body)
+        elif path == "/directions/v2:computeRoutes":
+            endpoint, payload = "computeRoutes", self._compute_routes(body)
+        elif path == "/distanceMatrix/v2:computeRouteMatrix":
+            endpoint, payload = "computeRouteMatrix", self._compute_route_matrix(body)
+        elif method == "GET" and path.startswith("/v1/places/") and path.endswith("/media"):
+            endpoint = "photo_media"
+            image = self.images[zlib.crc32(path.encode()) % len(self.images)]
+            self._count(endpoint)
+            self._send(handler, 200, image, "image/jpeg")
+            return
+        elif method == "GET" and path.startswith("/v1/places/"):
+            endpoint, payload = "place_details", self._place_details(path[len("/v1/places/"):], field_mask)
+        else:
+            endpoint, payload = "unknown", None
+
+        self._count(endpoint)
+        if payload is None:
+            self._send(handler, 404, b'{"error": {"code": 404}}', "application/json")
+        else:
+            self._send(handler, 200, json.dumps(payload, ensure_ascii=False).encode(), "application/json")
+
+    def _count(self, endpoint: str) -> None:
+        with self._lock:
+            self.request_counts[endpoint] = self.request_counts.get(endpoint, 0) + 1
+
+    @staticmethod
+    def _send(handler: BaseHTTPRequestHandler, status: int, data: bytes, content_type: str) -> None:
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    def _search_text(self, body: dict, field_mask: str) -> dict:
+        m = re.fullmatch(r"bench-(\d+)", body.get("textQuery", ""))
+        if not m:
+            return {"places": []}
+        start = int(m.group(1)) * PLACES_PER_QUERY
+        end = min(start + PLACES_PER_QUERY, len(self.places))
+        offset = start + int(body.get("pageToken") or 0)
+        page = self.places[offset:min(offset + PAGE_SIZE, end)]
+
+        result = {"places": [_masked(p, field_mask, "places.") for p in page]}
+        if offset + PAGE_SIZE < end:
+            result["nextPageToken"] = str(offset + PAGE_SIZE - start)
+        return result
+
+    def _place_details(self, place_id: str, field_mask: str) -> dict | None:
+        if place_id.startswith("station-"):
+            index = int(place_id.split("-", 1)[1])
+            if not 0 <= index < len(self.stations):
+                return None
+            line = self.stations[index][3]
+            summary = f"{line}の駅。" if line else ""
+            return _masked({"editorialSummary": {"text": summary, "languageCode": "ja"}}, field_mask)
+        place = self.places_by_id.get(place_id)
+        return None if place is None else _masked(place, field_mask)
+
+    def _search_nearby(self, body: dict) -> dict:
+        circle = body.get("locationRestriction", {}).get("circle", {})
+        center = circle.get("center", {})
+        radius_km = circle.get("radius", 1000) / 1000
+        best = None
+        for i, (lat, lng, name, _) in enumerate(self.stations):
+            distance = haversine_km(center.get("latitude", 0), center.get("longitude", 0), lat, lng)
+            if distance <= radius_km and (best is None or distance < best[0]):
+                best = (distance, i, name)
+        if best is None:
+            return {}
+        return {"places": [{
+            "id": f"station-{best[1]}",
+            "displayName": {"text": best[2], "languageCode": "ja"},
+        }]}
+
+    def _compute_routes(self, body: dict) -> dict:
+        seconds, meters = _route(body["origin"], body["destination"])
+        return {"routes": [{"duration": f"{seconds}s", "distanceMeters": meters}]}
+
+    def _compute_route_matrix(self, body: dict) -> list[dict]:
+        elements = []
+        for oi, origin in enumerate(body.get("origins", [])):
+            for di, destination in enumerate(body.get("destinations", [])):
+                seconds, meters = _route(origin["waypoint"], destination["waypoint"])
+                element = {
+                    "status": {},
+                    "condition": "ROUTE_EXISTS",
+                    "duration": f"{seconds}s",
+                    "distanceMeters": meters,
+                }
+                # 本物の API と同様に 0 のインデックスは省略する
+                if oi:
+                    element["originIndex"] = oi
+                if di:
+                    element["destinationIndex"] = di
+                elements.append(element)
+        return elements
@@ -0,0 +1,84 @@
+"""座標計算と近傍検索"""
+import math
+import threading
+from typing import Any
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+
+# 緯度1度あたりの距離（m）
+METERS_PER_DEG_LAT = 111_320
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """2点間の直線距離（km）を計算する。"""
+    dlat = math.radians(lat2 - lat1)
+    dlng = math.radians(lng2 - lng1)
+    a = (math.sin(dlat / 2) ** 2 +
+         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
+         math.sin(dlng / 2) ** 2)
+    return EARTH_RADIUS_KM * 2 * math.asin(math.sqrt(a))
+
+
+def haversine_km_many(
+    lat: float,
+    lng: float,
+    lats: np.ndarray,
+    lngs: np.ndarray,
+) -> np.ndarray:
+    """1点から複数点への直線距離（km）を NumPy で一括計算する。"""
+    lat1 = np.radians(lat)
+    lat2 = np.radians(lats)
+    dlat = lat2 - lat1
+    dlng = np.radians(lngs) - np.radians(lng)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arcsin(np.sqrt(a))
+
+
+class GridIndex:
+    """緯度経度をほぼ正方形のセルに区切ったバケットによる近傍検索インデックス。
+
+    半径 r の検索では、中心セルの周囲 ceil(r / cell_m) セル分だけを走査する。
+    東京周辺の狭い範囲を想定し、経度方向のセル幅は基準緯度で固定する。
+    スレッドセーフ。
+    """
+
+    def __init__(self, cell_m: float = 200.0, ref_lat: float = 35.68):
+        self.cell_m = cell_m
+        self._lat_step = cell_m / METERS_PER_DEG_LAT
+        self._lng_step = cell_m / (METERS_PER_DEG_LAT * math.cos(math.radians(ref_lat)))
+        self._cells: dict[tuple[int, int], list[tuple[float, float, Any]]] = {}
+        self._lock = threading.Lock()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _cell(self, lat: float, lng: float) -> tuple[int, int]:
+        return math.floor(lat / self._lat_step), math.floor(lng / self._lng_step)
+
+    def insert(self, lat: float, lng: float, item: Any) -> None:
+        """点を登録する。"""
+        with self._lock:
+            self._cells.setdefault(self._cell(lat, lng), []).append((lat, lng, item))
+            self._size += 1
+
+    def within(self, lat: float, lng: float, radius_m: float) -> list[tuple[float, Any]]:
+        """半径 radius_m 以内の点を近い順に返す。
+
+        Returns:
+            [(距離m, item), ...]
+        """
+        span = max(1, math.ceil(radius_m / self.cell_m))
+        ci, cj = self._cell(lat, lng)
+        found = []
+        with self._lock:
+            for i in range(ci - span, ci + span + 1):
+                for j in range(cj - span, cj + span + 1):
+                    for p_lat, p_lng, item in self._cells.get((i, j), ()):
+                        distance_m = haversine_km(lat, lng, p_lat, p_lng) * 1000
+                        if distance_m <= radius_m:
+                            found.append((distance_m, item))
+        found.sort(key=lambda x: x[0])
+        return found
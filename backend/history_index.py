@@ -0,0 +1,70 @@
+"""推薦履歴の索引（place_id → 最終推薦日時・推薦回数）
+
+data/history.json は全週分を保持して増え続けるため、選定時の参照には
+小さな索引 data/history_index.json を使う。
+
+    {
+        "places": {
+            "<place_id>": {"last_recommended_at": ISO8601, "count": int},
+            ...
+        }
+    }
+
+索引は update_history で週ごとに更新する。索引がない場合は
+history.json から一度だけ作り直す。
+"""
+import json
+import logging
+from datetime import datetime
+
+from backend.config import HISTORY_FILE, HISTORY_INDEX_FILE
+
+logger = logging.getLogger(__name__)
+
+
+def build_history_index() -> dict[str, dict]:
+    """history.json 全体から索引を作る。"""
+    try:
+        with open(HISTORY_FILE, "r", encoding="utf-8") as f:
+            history = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+    places: dict[str, dict] = {}
+    # weeks は新しい順。古い週から順に反映して最終推薦日時を決める
+    for week in reversed(history.get("weeks", [])):
+        add_week(places, week)
+    return places
+
+
+def add_week(places: dict[str, dict], week: dict) -> None:
+    """1週分の推薦を索引に反映する。"""
+    generated_at = week["generated_at"]
+    for r in week.get("restaurants", []):
+        entry = places.setdefault(r["place_id"], {"last_recommended_at": generated_at, "count": 0})
+        entry["count"] += 1
+        if (datetime.fromisoformat(generated_at)
+                > datetime.fromisoformat(entry["last_recommended_at"])):
+            entry["last_recommended_at"] = generated_at
+
+
+def load_history_index() -> dict[str, dict]:
+    """索引を読み込む。ない場合は history.json から作って保存する。"""
+    try:
+        with open(HISTORY_INDEX_FILE, "r", encoding="utf-8") as f:
+            return json.load(f).get("places", {})
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+
+    places = build_history_index()
+    if places:
+        save_history_index(places)
+        logger.info(f"history_index.json を作成: {len(places)}件")
+    return places
+
+
+def save_history_index(places: dict[str, dict]) -> None:
+    """索引を保存する。"""
+    HISTORY_INDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(HISTORY_INDEX_FILE, "w", encoding="utf-8") as f:
+        json.dump({"places": places}, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,147 @@
+"""Google API 共通の HTTP クライアント（接続プール + リトライ）
+
+places_client / routes_client / photo_downloader はすべてこのモジュール経由で
+HTTP リクエストを送る。
+
+- プロセス内で1つの requests.Session を共有し、ホストごとに
+  keep-alive の接続プールを持つ（TLS ハンドシェイクを使い回す）
+- 429 / 5xx と接続エラー・タイムアウトは指数バックオフ（フルジッター）で再試行する
+- Retry-After ヘッダがあればその秒数（または日時）まで待つ
+- 各試行の所要時間・ステータス・受信バイト数をエンドポイント別に metrics へ記録する
+
+Google の検索・詳細・経路 API はすべて読み取り専用なので、POST も再試行してよい。
+"""
+import email.utils
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from backend import metrics
+
+logger = logging.getLogger(__name__)
+
+# 再試行するステータスコード
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+# 最大再試行回数（初回を含まない）
+MAX_RETRIES = 4
+# バックオフの基準秒数と上限秒数（基準 × 2^試行回数 を上限で打ち切り、0〜その値でジッター）
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 30.0
+
+# ホストごとの接続プールサイズ（並列ワーカー数に合わせる）
+HOST_POOL_SIZES = {
+    "places.googleapis.com": 16,
+    "routes.googleapis.com": 8,
+    # 写真 /media のリダイレクト先
+    "lh3.googleusercontent.com": 16,
+}
+DEFAULT_POOL_SIZE = 10
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """共有 Session を返す（初回に生成）。"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(
+                pool_connections=len(HOST_POOL_SIZES) + 1,
+                pool_maxsize=DEFAULT_POOL_SIZE,
+            ))
+            # ローカルの代替サーバー（ベンチマーク）は http で、最大のプールサイズを使う
+            session.mount("http://", HTTPAdapter(pool_maxsize=max(HOST_POOL_SIZES.values())))
+            for host, size in HOST_POOL_SIZES.items():
+                session.mount(f"https://{host}/", HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=size,
+                ))
+            _session = session
+        return _session
+
+
+def _retry_after_seconds(resp: requests.Response) -> float | None:
+    """Retry-After ヘッダ（秒数または HTTP 日時）を待機秒数に変換する。"""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _backoff_seconds(attempt: int) -> float:
+    """attempt 回目（0始まり）の再試行までの待機秒数（フルジッター）。"""
+    cap = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt))
+    return random.uniform(0, cap)
+
+
+def request(
+    method: str,
+    url: str,
+    max_retries: int = MAX_RETRIES,
+    **kwargs,
+) -> requests.Response:
+    """共有 Session でリクエストを送り、一時的な失敗は再試行する。
+
+    最後のレスポンスをそのまま返す（raise_for_status は呼び出し側で行う）。
+    再試行しても接続できなかった場合は最後の例外を送出する。
+    """
+    session = get_session()
+    endpoint = metrics.endpoint_name(method, url)
+    for attempt in range(max_retries + 1):
+        started = time.perf_counter()
+        try:
+            resp = session.request(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            metrics.record_http(endpoint, time.perf_counter() - started, None, retry=attempt > 0)
+            if attempt >= max_retries:
+                raise
+            wait = _backoff_seconds(attempt)
+            logger.debug(f"HTTP 接続エラー、{wait:.1f}秒後に再試行 ({attempt + 1}/{max_retries}): {e}")
+            time.sleep(wait)
+            continue
+
+        metrics.record_http(
+            endpoint,
+            time.perf_counter() - started,
+            resp.status_code,
+            len(resp.content),
+            retry=attempt > 0,
+        )
+        if resp.status_code not in RETRY_STATUS_CODES or attempt >= max_retries:
+            return resp
+
+        retry_after = _retry_after_seconds(resp)
+        wait = retry_after if retry_after is not None else _backoff_seconds(attempt)
+        wait = min(wait, BACKOFF_MAX_SECONDS)
+        logger.info(
+            f"HTTP {resp.status_code}、{wait:.1f}秒後に再試行 ({attempt + 1}/{max_retries})"
+        )
+        resp.close()
+        time.sleep(wait)
+
+    raise RuntimeError("unreachable")
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
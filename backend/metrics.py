@@ -0,0 +1,229 @@
+"""週次パイプラインの計測（ステップ別の所要時間・API 呼び出し・キャッシュ・転送量）
+
+run_weekly が stage() で各ステップを囲み、http_client・各キャッシュ・写真保存が
+record_* で記録する。記録はその時点で実行中のステップに集計される
+（ステップ内で起動したワーカースレッドの分も含む）。
+実行の最後に write_report() で data/metrics/ に JSON レポートを書き出す。
+
+レポート形式:
+    {
+        "started_at": ISO8601,
+        "wall_seconds": float,
+        "stages": {
+            "<ステップ名>": {
+                "wall_seconds": float,
+                "http": {"<endpoint>": {"calls", "errors", "retries", "bytes",
+                                         "p50_ms", "p90_ms", "p99_ms", "max_ms"}},
+                "cache": {"<キャッシュ名>": {"hits", "misses", "hit_ratio"}},
+                "bytes": {"downloaded": int, "written": int},
+            },
+            ...
+        },
+        "totals": {ステップ合計（stages と同じ形式の http / cache / bytes）},
+    }
+"""
+import json
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator
+from urllib.parse import urlsplit
+
+from backend.config import METRICS_DIR
+
+logger = logging.getLogger(__name__)
+
+JST = timezone(timedelta(hours=9))
+
+# ステップ外（stage() で囲まれていない処理）の記録先
+NO_STAGE = "other"
+
+_lock = threading.Lock()
+_current_stage = NO_STAGE
+_started_at: datetime | None = None
+_started_perf = 0.0
+_stages: dict[str, dict] = {}
+
+
+def _new_stage() -> dict:
+    return {
+        "wall_seconds": 0.0,
+        "http": {},
+        "cache": {},
+        "bytes": {"downloaded": 0, "written": 0},
+    }
+
+
+def _stage_locked() -> dict:
+    return _stages.setdefault(_current_stage, _new_stage())
+
+
+def reset() -> None:
+    """記録をすべて消し、計測を開始し直す。"""
+    global _current_stage, _started_at, _started_perf
+    with _lock:
+        _stages.clear()
+        _current_stage = NO_STAGE
+        _started_at = datetime.now(JST)
+        _started_perf = time.perf_counter()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """with ブロックを1つのステップとして所要時間を計り、その間の記録を集計する。"""
+    global _current_stage
+    with _lock:
+        previous = _current_stage
+        _current_stage = name
+        _stage_locked()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        with _lock:
+            _stages[name]["wall_seconds"] += time.perf_counter() - started
+            _current_stage = previous
+
+
+def endpoint_name(method: str, url: str) -> str:
+    """URL から集計用のエンドポイント名を返す。"""
+    parts = urlsplit(url)
+    path = parts.path
+    if path.endswith(":searchText"):
+        return "searchText"
+    if path.endswith(":searchNearby"):
+        return "searchNearby"
+    if path.endswith(":computeRoutes"):
+        return "computeRoutes"
+    if path.endswith(":computeRouteMatrix"):
+        return "computeRouteMatrix"
+    if path.endswith("/media"):
+        return "photo_media"
+    if method == "GET" and "/places/" in path:
+        return "place_details"
+    return f"{method} {parts.hostname}"
+
+
+def record_http(
+    endpoint: str,
+    seconds: float,
+    status: int | None,
+    nbytes: int = 0,
+    retry: bool = False,
+) -> None:
+    """HTTP リクエスト1回（再試行は1回ずつ）を記録する。
+
+    Args:
+        endpoint: endpoint_name() の名前
+        seconds: 応答までの秒数
+        status: HTTP ステータス（接続エラー・タイムアウトは None）
+        nbytes: レスポンス本文のバイト数
+        retry: 再試行による呼び出しか
+    """
+    with _lock:
+        stats = _stage_locked()["http"].setdefault(endpoint, {
+            "calls": 0, "errors": 0, "retries": 0, "bytes": 0, "latencies_ms": [],
+        })
+        stats["calls"] += 1
+        stats["retries"] += int(retry)
+        stats["errors"] += int(status is None or status >= 400)
+        stats["bytes"] += nbytes
+        stats["latencies_ms"].append(seconds * 1000)
+        _stage_locked()["bytes"]["downloaded"] += nbytes
+
+
+def record_cache(cache: str, hit: bool, count: int = 1) -> None:
+    """キャッシュの参照結果を記録する（count 件まとめて記録できる）。"""
+    if count <= 0:
+        return
+    with _lock:
+        stats = _stage_locked()["cache"].setdefault(cache, {"hits": 0, "misses": 0})
+        stats["hits" if hit else "misses"] += count
+
+
+def record_written(nbytes: int) -> None:
+    """ディスクに書き出したバイト数を記録する。"""
+    with _lock:
+        _stage_locked()["bytes"]["written"] += nbytes
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    """最近傍順位法のパーセンタイル。"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _summarize(http: dict, cache: dict, nbytes: dict) -> dict:
+    http_summary = {}
+    for endpoint, stats in sorted(http.items()):
+        latencies = sorted(stats["latencies_ms"])
+        http_summary[endpoint] = {
+            "calls": stats["calls"],
+            "errors": stats["errors"],
+            "retries": stats["retries"],
+            "bytes": stats["bytes"],
+            "p50_ms": round(_percentile(latencies, 50), 1),
+            "p90_ms": round(_percentile(latencies, 90), 1),
+            "p99_ms": round(_percentile(latencies, 99), 1),
+            "max_ms": round(latencies[-1], 1) if latencies else 0.0,
+        }
+    cache_summary = {}
+    for name, stats in sorted(cache.items()):
+        total = stats["hits"] + stats["misses"]
+        cache_summary[name] = {
+            **stats,
+            "hit_ratio": round(stats["hits"] / total, 3) if total else None,
+        }
+    return {"http": http_summary, "cache": cache_summary, "bytes": dict(nbytes)}
+
+
+def report() -> dict:
+    """ここまでの記録をレポートにまとめる。"""
+    with _lock:
+        stages = {}
+        total_http: dict[str, dict] = {}
+        total_cache: dict[str, dict] = {}
+        total_bytes = {"downloaded": 0, "written": 0}
+        for name, data in _stages.items():
+            stages[name] = {
+                "wall_seconds": round(data["wall_seconds"], 3),
+                **_summarize(data["http"], data["cache"], data["bytes"]),
+            }
+            for endpoint, stats in data["http"].items():
+                total = total_http.setdefault(endpoint, {
+                    "calls": 0, "errors": 0, "retries": 0, "bytes": 0, "latencies_ms": [],
+                })
+                for key in ("calls", "errors", "retries", "bytes", "latencies_ms"):
+                    total[key] += stats[key]
+            for cache, stats in data["cache"].items():
+                total = total_cache.setdefault(cache, {"hits": 0, "misses": 0})
+                total["hits"] += stats["hits"]
+                total["misses"] += stats["misses"]
+            for key in total_bytes:
+                total_bytes[key] += data["bytes"][key]
+
+        started_at = _started_at or datetime.now(JST)
+        return {
+            "started_at": started_at.isoformat(),
+            "wall_seconds": round(time.perf_counter() - _started_perf, 3) if _started_at else 0.0,
+            "stages": stages,
+            "totals": _summarize(total_http, total_cache, total_bytes),
+        }
+
+
+def write_report(directory: Path = METRICS_DIR) -> Path:
+    """レポートを data/metrics/<開始日時>.json に書き出し、そのパスを返す。"""
+    data = report()
+    directory.mkdir(parents=True, exist_ok=True)
+    started_at = datetime.fromisoformat(data["started_at"])
+    path = directory / f"{started_at.strftime('%Y-%m-%d_%H%M%S')}.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    logger.info(f"計測レポート出力: {path}")
+    return path
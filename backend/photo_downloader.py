@@ -1,17 +1,40 @@
 """レストラン写真のダウンロードと保存"""
+import hashlib
 import io
 import logging
-from pathlib import Path
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 
-import requests
 from PIL import Image
 
-from backend.config import PHOTOS_DIR, get_api_key
+from backend import http_client, metrics
+from backend.cache_store import CacheStore, get_store
+from backend.config import PHOTOS_DIR, PHOTO_MANIFEST_FILE, PLACES_API_BASE_URL, get_api_key
 
-BASE_URL = "https://places.googleapis.com/v1"
+BASE_URL = PLACES_API_BASE_URL
+
+JST = timezone(timedelta(hours=9))
+
+# 保存ファイル名に使う内容ハッシュ（SHA-256）の桁数
+CONTENT_HASH_CHARS = 20
+
+# 写真バリアントの形式 → (拡張子, Pillow のフォーマット名)
+VARIANT_FORMATS = {
+    "avif": ("avif", "AVIF"),
+    "webp": ("webp", "WEBP"),
+    "jpeg": ("jpg", "JPEG"),
+}
 
 logger = logging.getLogger(__name__)
 
+# 画像圧縮用のプロセスプール（_get_compress_pool で遅延生成）
+_compress_pool: ProcessPoolExecutor | None = None
+_compress_pool_lock = threading.Lock()
+
 
 def compress_image(
     data: bytes,
@@ -20,8 +43,7 @@ def compress_image(
 ) -> bytes:
     """画像バイト列を再圧縮して軽量なJPEGバイト列を返す。
 
-    - target_width より大きい画像は等比で縮小する。
-    - RGB に変換して JPEG（最適化・プログレッシブ）で保存する。
+    encode_variants で target_width の JPEG（最適化・プログレッシブ）を1つだけ書き出す。
 
     Args:
         data: 元画像のバイト列
@@ -31,28 +53,272 @@ def compress_image(
     Returns:
         圧縮後のJPEGバイト列。失敗時は元の data をそのまま返す。
     """
+    _, variants = encode_variants(data, [target_width], ["jpeg"], {"jpeg": quality})
+    if not variants:
+        logger.warning("画像圧縮に失敗したため元データを使用します")
+        return data
+    return variants[0]["data"]
+
+
+def available_variant_formats(formats: list[str]) -> list[str]:
+    """formats のうち、この環境の Pillow で書き出せる形式だけを返す。
+
+    AVIF は Pillow 11.3 以降（または pillow-avif-plugin 導入時）のみ対応。
+    """
+    Image.init()
+    available = []
+    for fmt in formats:
+        if fmt not in VARIANT_FORMATS:
+            logger.warning(f"未対応の写真形式のため無視します: {fmt}")
+        elif VARIANT_FORMATS[fmt][1] in Image.SAVE:
+            available.append(fmt)
+    return available
+
+
+# 形式ごとのエンコーダ設定の既定値（AVIF の speed は 0〜10 で大きいほど速い、
+# WebP の method は 0〜6 で大きいほど遅く小さい）。AVIF の既定 speed 6 と WebP の
+# method 6 は1枚あたり数百ミリ秒かかるため、サイズがほぼ変わらない範囲で速くする
+DEFAULT_ENCODER_OPTIONS = {
+    "avif": {"speed": 8},
+    "webp": {"method": 4},
+}
+
+
+def _save_options(fmt: str, quality: int, encoder_options: dict | None = None) -> dict:
+    if fmt == "jpeg":
+        return {"quality": quality, "optimize": True, "progressive": True}
+    return {
+        **DEFAULT_ENCODER_OPTIONS.get(fmt, {}),
+        **(encoder_options or {}),
+        "quality": quality,
+    }
+
+
+def encode_variants(
+    data: bytes,
+    widths: list[int],
+    formats: list[str],
+    qualities: dict[str, int],
+    encoder_options: dict[str, dict] | None = None,
+) -> tuple[tuple[int, int], list[dict]]:
+    """画像を複数の幅・形式に書き出す。
+
+    元画像より大きい幅には拡大せず、元画像の幅で書き出す。
+
+    Args:
+        data: 元画像のバイト列
+        widths: 書き出す幅（ピクセル）
+        formats: 書き出す形式（VARIANT_FORMATS のキー）
+        qualities: 形式ごとの品質
+        encoder_options: 形式ごとのエンコーダ設定（{"avif": {"speed": 8}}。
+            省略した項目は DEFAULT_ENCODER_OPTIONS）
+
+    Returns:
+        (元画像の (幅, 高さ), [{"format", "width", "height", "data"}])。
+        読み込みに失敗した場合はバリアントなし。
+    """
     try:
-        with Image.open(io.BytesIO(data)) as img:
+        with Image.open(io.BytesIO(data)) as src:
             # RGB に変換（メタ情報・アルファ・パレットを破棄）
-            img = img.convert("RGB")
-
-            if img.width > target_width:
-                ratio = target_width / img.width
-                new_size = (target_width, max(1, round(img.height * ratio)))
-                img = img.resize(new_size, Image.LANCZOS)
-
-            buffer = io.BytesIO()
-            img.save(
-                buffer,
-                format="JPEG",
-                quality=quality,
-                optimize=True,
-                progressive=True,
-            )
-            return buffer.getvalue()
+            src = src.convert("RGB")
+            source_size = src.size
+            variants = []
+            for width in sorted({min(w, src.width) for w in widths}):
+                if width == src.width:
+                    img = src
+                else:
+                    img = src.resize(
+                        (width, max(1, round(src.height * width / src.width))),
+                        Image.LANCZOS,
+                    )
+                for fmt in formats:
+                    buffer = io.BytesIO()
+                    img.save(
+                        buffer,
+                        format=VARIANT_FORMATS[fmt][1],
+                        **_save_options(
+                            fmt, qualities.get(fmt, 65), (encoder_options or {}).get(fmt),
+                        ),
+                    )
+                    variants.append({
+                        "format": fmt,
+                        "width": img.width,
+                        "height": img.height,
+                        "data": buffer.getvalue(),
+                    })
+            return source_size, variants
     except Exception as e:
-        logger.warning(f"画像圧縮に失敗したため元データを使用します: {e}")
-        return data
+        logger.warning(f"写真バリアントの書き出しに失敗しました: {e}")
+        return (0, 0), []
+
+
+def _encode_timed(
+    data: bytes,
+    widths: list[int],
+    formats: list[str],
+    qualities: dict[str, int],
+    encoder_options: dict[str, dict] | None = None,
+) -> tuple[list[dict], float]:
+    """encode_variants を実行し、バリアントと処理時間（秒）を返す（プロセスプール用）。"""
+    started = time.perf_counter()
+    _, variants = encode_variants(data, widths, formats, qualities, encoder_options)
+    return variants, time.perf_counter() - started
+
+
+def _get_compress_pool(workers: int = 0) -> ProcessPoolExecutor:
+    """画像圧縮用のプロセスプールを返す（プロセス内で共有、初回に生成）。
+
+    Args:
+        workers: プロセス数。0 以下なら CPU コア数。
+    """
+    global _compress_pool
+    with _compress_pool_lock:
+        if _compress_pool is None:
+            max_workers = workers if workers > 0 else (os.cpu_count() or 1)
+            # スレッドから起動されるため fork ではなく spawn を使う
+            _compress_pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info(f"画像圧縮プロセスプール起動: {max_workers}プロセス")
+        return _compress_pool
+
+
+def shutdown_compress_pool() -> None:
+    """画像圧縮用のプロセスプールを終了する。"""
+    global _compress_pool
+    with _compress_pool_lock:
+        if _compress_pool is not None:
+            _compress_pool.shutdown()
+            _compress_pool = None
+
+
+def _fetch_photo(photo_name: str, max_width: int) -> tuple[bytes, float]:
+    """写真を1枚ダウンロードし、バイト列と所要時間（秒）を返す。"""
+    started = time.perf_counter()
+    # 写真を直接ダウンロード（HTTPリダイレクトを追跡）
+    media_url = f"{BASE_URL}/{photo_name}/media"
+    params = {"maxWidthPx": max_width, "key": get_api_key()}
+    resp = http_client.get(media_url, params=params, timeout=30, allow_redirects=True)
+    resp.raise_for_status()
+
+    # 画像データであることを確認
+    content_type = resp.headers.get("Content-Type", "")
+    if "image" not in content_type:
+        raise ValueError(f"画像でないレスポンス Content-Type={content_type}")
+    return resp.content, time.perf_counter() - started
+
+
+def _manifest() -> CacheStore:
+    """写真マニフェスト（Places の写真名 → 保存ファイル）を返す。"""
+    return get_store(PHOTO_MANIFEST_FILE)
+
+
+def _variant_settings(
+    target_width: int,
+    jpeg_quality: int,
+    variant_widths: list[int],
+    variant_formats: list[str],
+    variant_quality: dict[str, int],
+    encoder_options: dict[str, dict],
+) -> dict:
+    """バリアントの書き出し設定（マニフェストでの再利用判定に使う）。"""
+    return {
+        "widths": sorted({w for w in variant_widths if w < target_width} | {target_width}),
+        "formats": list(variant_formats),
+        "quality": {fmt: variant_quality.get(fmt, 65) for fmt in variant_formats},
+        "encoder": {
+            fmt: {**DEFAULT_ENCODER_OPTIONS.get(fmt, {}), **encoder_options.get(fmt, {})}
+            for fmt in variant_formats
+            if fmt != "jpeg"
+        },
+    }
+
+
+def _lookup_stored_photo(
+    manifest: CacheStore,
+    photo_name: str,
+    target_width: int,
+    jpeg_quality: int,
+    settings: dict,
+) -> dict | None:
+    """同じ圧縮設定で保存済みの写真があればマニフェストのエントリを返す。"""
+    entry = manifest.get(photo_name)
+    if not entry:
+        return None
+    if (entry.get("target_width") != target_width
+            or entry.get("jpeg_quality") != jpeg_quality
+            or entry.get("variant_settings") != settings):
+        return None
+    filenames = [entry.get("filename", "")]
+    filenames += [v["filename"] for v in entry.get("variants", [])]
+    if not all(name and (PHOTOS_DIR / name).exists() for name in filenames):
+        return None
+    return entry
+
+
+def _write_content_addressed(data: bytes, ext: str) -> tuple[str, str]:
+    """内容ハッシュ名でファイルを書き出し、(ファイル名, SHA-256) を返す。
+
+    同じ内容のファイルが既にあれば書き込まずに共有する。
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    filename = f"{digest[:CONTENT_HASH_CHARS]}.{ext}"
+    filepath = PHOTOS_DIR / filename
+    if not filepath.exists():
+        with open(filepath, "wb") as f:
+            f.write(data)
+        metrics.record_written(len(data))
+    return filename, digest
+
+
+def _store_photo(
+    manifest: CacheStore,
+    photo_name: str,
+    variants: list[dict],
+    target_width: int,
+    jpeg_quality: int,
+    settings: dict,
+) -> dict:
+    """書き出したバリアントを内容ハッシュ名で保存し、マニフェストに登録する。
+
+    最大幅の JPEG を従来の "filename"（フォールバック用）とする。
+
+    Returns:
+        マニフェストのエントリ
+    """
+    stored_variants = []
+    fallback = None
+    for variant in variants:
+        filename, digest = _write_content_addressed(
+            variant["data"], VARIANT_FORMATS[variant["format"]][0],
+        )
+        stored_variants.append({
+            "filename": filename,
+            "format": variant["format"],
+            "width": variant["width"],
+            "height": variant["height"],
+        })
+        if variant["format"] == "jpeg" and (
+            fallback is None or variant["width"] >= fallback["width"]
+        ):
+            fallback = {**stored_variants[-1], "sha256": digest}
+    if fallback is None:
+        raise ValueError("JPEG の書き出しに失敗しました")
+
+    entry = {
+        "filename": fallback["filename"],
+        "sha256": fallback["sha256"],
+        "width": fallback["width"],
+        "height": fallback["height"],
+        "variants": stored_variants,
+        "target_width": target_width,
+        "jpeg_quality": jpeg_quality,
+        "variant_settings": settings,
+        "stored_at": datetime.now(JST).isoformat(),
+    }
+    manifest.put(photo_name, entry)
+    return entry
 
 
 def download_photos(
@@ -62,8 +328,26 @@ def download_photos(
     max_width: int = 960,
     target_width: int = 640,
     jpeg_quality: int = 65,
+    fetch_workers: int = 4,
+    compress_workers: int = 0,
+    variant_widths: list[int] | None = None,
+    variant_formats: list[str] | None = None,
+    variant_quality: dict[str, int] | None = None,
+    encoder_options: dict[str, dict] | None = None,
 ) -> list[dict]:
-    """Places API の写真をダウンロードし、圧縮してローカルに保存する。
+    """Places API の写真をダウンロードし、複数の幅・形式に圧縮してローカルに保存する。
+
+    写真は最大 fetch_workers 並列でダウンロードし、届いたものから順に
+    プロセスプールで圧縮する（ダウンロードと圧縮が重なる）。
+    写真ごとの取得・圧縮時間と削減バイト数をログに出力する。
+
+    各写真は target_width 以下の variant_widths と target_width の各幅について、
+    variant_formats（この環境で書き出せるもののみ）と JPEG で書き出す。
+    最大幅の JPEG が従来どおりの "filename" になる。
+
+    保存ファイルは内容ハッシュで命名し（同一内容は1ファイルを共有）、
+    写真名 → ファイルの対応を写真マニフェストに記録する。同じ写真名・同じ
+    圧縮設定で保存済みの写真はダウンロードも再圧縮もしない。
 
     Args:
         place_id: Google Place ID
@@ -72,83 +356,111 @@ def download_photos(
         max_width: Google API から取得する幅（縮小元）
         target_width: 保存時の最終的な最大幅（ピクセル）
         jpeg_quality: JPEG圧縮品質（1〜95）
+        fetch_workers: ダウンロードの並列数
+        compress_workers: 圧縮プロセス数（0 なら CPU コア数。初回呼び出し時のみ有効）
+        variant_widths: srcset 用に追加で書き出す幅（target_width 超は無視）
+        variant_formats: JPEG 以外に書き出す形式（"avif", "webp"）
+        variant_quality: 形式ごとの品質（{"webp": 60, "avif": 50}）
+        encoder_options: 形式ごとのエンコーダ設定（{"avif": {"speed": 8}, "webp": {"method": 4}}）
 
     Returns:
         保存した写真情報のリスト:
-        [{"filename": "xxx.jpg", "attribution": "..."}]
+        [{"filename": "<内容ハッシュ>.jpg", "attribution": "...",
+          "width": int, "height": int,
+          "variants": [{"filename", "format", "width", "height"}, ...]}]
     """
     PHOTOS_DIR.mkdir(parents=True, exist_ok=True)
-    saved = []
 
-    for i, photo in enumerate(photos[:max_photos]):
-        photo_name = photo.get("name", "")
-        if not photo_name:
-            continue
+    targets = [
+        (i, photo) for i, photo in enumerate(photos[:max_photos])
+        if photo.get("name", "")
+    ]
+    if not targets:
+        return []
+
+    formats = available_variant_formats(
+        [f for f in (variant_formats or []) if f != "jpeg"]
+    ) + ["jpeg"]
+    qualities = {**(variant_quality or {}), "jpeg": jpeg_quality}
+    settings = _variant_settings(
+        target_width, jpeg_quality, variant_widths or [], formats, qualities,
+        encoder_options or {},
+    )
 
-        filename = f"{place_id}_{i}.jpg"
-        filepath = PHOTOS_DIR / filename
+    manifest = _manifest()
+    # 同じ写真・同じ圧縮設定で保存済みのものはダウンロードしない
+    stored: dict[str, dict] = {}
+    for _, photo in targets:
+        entry = _lookup_stored_photo(
+            manifest, photo["name"], target_width, jpeg_quality, settings,
+        )
+        if entry:
+            stored[photo["name"]] = entry
+    to_fetch = [photo for _, photo in targets if photo["name"] not in stored]
+    metrics.record_cache("photo", hit=True, count=len(stored))
+    metrics.record_cache("photo", hit=False, count=len(to_fetch))
 
+    def _fetch_and_submit(photo: dict) -> tuple[int, float, Future]:
+        data, fetch_seconds = _fetch_photo(photo["name"], max_width)
+        args = (data, settings["widths"], formats, qualities, encoder_options)
         try:
-            # 写真を直接ダウンロード（HTTPリダイレクトを追跡）
-            media_url = f"{BASE_URL}/{photo_name}/media"
-            params = {"maxWidthPx": max_width, "key": get_api_key()}
-            resp = requests.get(media_url, params=params, timeout=30, allow_redirects=True)
-            resp.raise_for_status()
-
-            # 画像データであることを確認
-            content_type = resp.headers.get("Content-Type", "")
-            if "image" not in content_type:
-                logger.warning(f"写真取得失敗（画像でない）: {photo_name} Content-Type={content_type}")
-                continue
-
-            original_kb = len(resp.content) // 1024
-            compressed = compress_image(
-                resp.content,
-                target_width=target_width,
-                quality=jpeg_quality,
-            )
+            future = _get_compress_pool(compress_workers).submit(_encode_timed, *args)
+        except Exception as e:
+            # プロセスプールが使えない場合はこのスレッドで圧縮する
+            logger.debug(f"プロセスプールに投入できないため直接圧縮します: {e}")
+            future = Future()
+            future.set_result(_encode_timed(*args))
+        return len(data), fetch_seconds, future
 
-            with open(filepath, "wb") as f:
-                f.write(compressed)
+    saved = []
+    total_before = 0
+    total_after = 0
+    with ThreadPoolExecutor(max_workers=max(1, fetch_workers)) as executor:
+        fetches = {
+            photo["name"]: executor.submit(_fetch_and_submit, photo)
+            for photo in to_fetch
+        }
+
+        for _, photo in targets:
+            photo_name = photo["name"]
+
+            if photo_name in stored:
+                entry = stored[photo_name]
+                logger.debug(f"写真は保存済みのため再利用: {entry['filename']}")
+            else:
+                try:
+                    original_size, fetch_seconds, encode_future = fetches[photo_name].result()
+                    variants, encode_seconds = encode_future.result()
+                    entry = _store_photo(
+                        manifest, photo_name, variants, target_width, jpeg_quality, settings,
+                    )
+                except Exception as e:
+                    logger.warning(f"写真ダウンロード失敗 ({photo_name}): {e}")
+                    continue
+
+                fallback_size = (PHOTOS_DIR / entry["filename"]).stat().st_size
+                total_before += original_size
+                total_after += fallback_size
+                logger.info(
+                    f"写真保存: {entry['filename']} ({original_size // 1024}KB → "
+                    f"{fallback_size // 1024}KB, バリアント {len(variants)}種, "
+                    f"取得 {fetch_seconds * 1000:.0f}ms / 圧縮 {encode_seconds * 1000:.0f}ms)"
+                )
 
             # 帰属情報
             authors = photo.get("authorAttributions", [])
             attribution = authors[0].get("displayName", "") if authors else ""
 
             saved.append({
-                "filename": filename,
+                "filename": entry["filename"],
                 "attribution": attribution,
+                "width": entry["width"],
+                "height": entry["height"],
+                "variants": entry["variants"],
             })
-            logger.info(
-                f"写真保存: {filename} ({original_kb}KB → {len(compressed) // 1024}KB)"
-            )
-
-        except Exception as e:
-            logger.warning(f"写真ダウンロード失敗 ({photo_name}): {e}")
 
+    logger.info(
+        f"写真 {len(saved)}枚 ({place_id}): 新規 {len(to_fetch)}枚 / 再利用 {len(stored)}枚, "
+        f"{(total_before - total_after) // 1024}KB 削減"
+    )
     return saved
-
-
-def cleanup_old_photos(keep_place_ids: set[str]) -> int:
-    """不要な写真を削除する。
-
-    Args:
-        keep_place_ids: 残すべき place_id のセット
-
-    Returns:
-        削除したファイル数
-    """
-    if not PHOTOS_DIR.exists():
-        return 0
-
-    deleted = 0
-    for filepath in PHOTOS_DIR.glob("*.jpg"):
-        # ファイル名形式: {place_id}_{index}.jpg
-        place_id = filepath.stem.rsplit("_", 1)[0]
-        if place_id not in keep_place_ids:
-            filepath.unlink()
-            deleted += 1
-
-    if deleted:
-        logger.info(f"古い写真を {deleted} 件削除しました")
-    return deleted
@@ -0,0 +1,171 @@
+"""参照されなくなった写真の削除（マーク&スイープ）
+
+current.json とアーカイブ（保持期間内の週）の photos から参照されている
+ファイル（バリアントを含む）をマークし、frontend/public/photos 配下の
+それ以外のファイルを削除（または退避）する。削除したファイルは
+写真マニフェスト・再圧縮マニフェストからも取り除く。
+
+run_weekly からアーカイブ更新後に毎週呼ばれる。単体でも実行できる:
+    python -m backend.photo_gc                   # 実行
+    python -m backend.photo_gc --dry-run         # 削除対象と削減量の表示のみ
+    python -m backend.photo_gc --move-to /tmp/x  # 削除せず退避する
+"""
+import argparse
+import json
+import logging
+import shutil
+import sys
+from pathlib import Path
+
+from backend.cache_store import get_store
+from backend.config import (
+    FRONTEND_DATA_DIR, PHOTOS_DIR, PHOTO_COMPRESS_MANIFEST_FILE, PHOTO_MANIFEST_FILE,
+)
+from backend.site_generator import load_archive_weeks_strict
+
+logger = logging.getLogger(__name__)
+
+
+def _photo_filenames(week: dict) -> set[str]:
+    """1週分（current.json / アーカイブの週）から参照される写真ファイル名。"""
+    names = set()
+    for r in week.get("restaurants", []):
+        for photo in r.get("photos", []):
+            names.add(photo["filename"])
+            names.update(v["filename"] for v in photo.get("variants", []))
+    return names
+
+
+def mark_referenced_photos() -> set[str] | None:
+    """current.json とアーカイブから参照される写真ファイル名を集める。
+
+    current.json・アーカイブの索引・索引にある週ファイルのどれかが読めない場合は
+    None（誤ってアーカイブの写真を削除しないよう呼び出し側で中止する）。
+    """
+    try:
+        with open(FRONTEND_DATA_DIR / "current.json", "r", encoding="utf-8") as f:
+            current = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        logger.warning(f"current.json を読み込めません: {e}")
+        return None
+
+    archive_weeks = load_archive_weeks_strict()
+    if archive_weeks is None:
+        return None
+
+    referenced = _photo_filenames(current)
+    for week in archive_weeks:
+        referenced |= _photo_filenames(week)
+    return referenced
+
+
+def _prune_manifests(removed: set[str]) -> int:
+    """削除したファイルを指すマニフェストのエントリを取り除く。"""
+    pruned = 0
+
+    manifest = get_store(PHOTO_MANIFEST_FILE)
+    stale = [
+        photo_name for photo_name, entry in manifest.items()
+        if entry.get("filename") in removed
+        or any(v["filename"] in removed for v in entry.get("variants", []))
+    ]
+    with manifest.batch():
+        for photo_name in stale:
+            manifest.delete(photo_name)
+    pruned += len(stale)
+
+    compress_manifest = get_store(PHOTO_COMPRESS_MANIFEST_FILE)
+    stale = [name for name in removed if name in compress_manifest]
+    with compress_manifest.batch():
+        for name in stale:
+            compress_manifest.delete(name)
+    pruned += len(stale)
+
+    return pruned
+
+
+def sweep_unreferenced_photos(
+    dry_run: bool = False,
+    move_to: Path | None = None,
+) -> dict:
+    """参照されていない写真を削除（move_to 指定時は退避）する。
+
+    Args:
+        dry_run: True なら削除せず対象の集計だけ行う
+        move_to: 削除せずにファイルを移動する先のディレクトリ
+
+    Returns:
+        {"referenced": int, "kept": int, "removed": int,
+         "reclaimed_bytes": int, "missing": int, "pruned_entries": int}
+    """
+    report = {
+        "referenced": 0, "kept": 0, "removed": 0,
+        "reclaimed_bytes": 0, "missing": 0, "pruned_entries": 0,
+    }
+    if not PHOTOS_DIR.exists():
+        return report
+
+    referenced = mark_referenced_photos()
+    if referenced is None:
+        logger.warning("参照の収集に失敗したため写真の削除を中止します")
+        return report
+
+    files = [p for p in PHOTOS_DIR.iterdir() if p.is_file()]
+    present = {p.name for p in files}
+    unreferenced = [p for p in files if p.name not in referenced]
+
+    report["referenced"] = len(referenced)
+    report["kept"] = len(files) - len(unreferenced)
+    report["missing"] = len(referenced - present)
+    report["removed"] = len(unreferenced)
+    report["reclaimed_bytes"] = sum(p.stat().st_size for p in unreferenced)
+
+    if report["missing"]:
+        logger.warning(f"参照されているのに存在しない写真: {report['missing']}件")
+
+    if not dry_run and unreferenced:
+        if move_to is not None:
+            move_to.mkdir(parents=True, exist_ok=True)
+        for filepath in unreferenced:
+            if move_to is not None:
+                shutil.move(filepath, move_to / filepath.name)
+            else:
+                filepath.unlink()
+        report["pruned_entries"] = _prune_manifests({p.name for p in unreferenced})
+
+    action = "退避" if move_to is not None else "削除"
+    logger.info(
+        f"{'[DRY-RUN] ' if dry_run else ''}写真の{action}: {report['removed']}件 "
+        f"({report['reclaimed_bytes'] / (1024 * 1024):.1f}MB), "
+        f"保持 {report['kept']}件"
+    )
+    return report
+
+
+def main() -> int:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        datefmt="%H:%M:%S",
+    )
+    parser = argparse.ArgumentParser(description="参照されなくなった写真を削除する")
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="削除せずに対象と削減量だけ表示する",
+    )
+    parser.add_argument(
+        "--move-to",
+        type=Path,
+        default=None,
+        help="削除せずに移動する先のディレクトリ",
+    )
+    args = parser.parse_args()
+
+    report = sweep_unreferenced_photos(dry_run=args.dry_run, move_to=args.move_to)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
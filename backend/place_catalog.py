@@ -0,0 +1,113 @@
+"""検索で見つかったレストランの永続カタログ
+
+Text Search の結果を data/place_catalog.jsonl に蓄積し、毎週の検索は
+クエリの一部（ローテーション）だけを更新する。候補はカタログ全体から選ぶ。
+
+各エントリ（キー: place_id）:
+    {
+        "place": <Text Search の place オブジェクト（最新）>,
+        "first_seen": ISO8601,
+        "last_refreshed": ISO8601,
+        "queries": [そのレストランが見つかったクエリ],
+    }
+"""
+import logging
+import math
+from datetime import datetime, timedelta
+
+from backend.cache_store import CacheStore, get_store
+from backend.config import PLACE_CATALOG_FILE
+
+logger = logging.getLogger(__name__)
+
+
+def _catalog() -> CacheStore:
+    """カタログのストアを返す（初回のみ読み込み）。"""
+    return get_store(PLACE_CATALOG_FILE)
+
+
+def select_refresh_queries(
+    queries: list[str],
+    per_run: int,
+    now: datetime,
+) -> list[str]:
+    """今回の実行で検索し直すクエリを週番号でローテーションして返す。
+
+    カタログが空の場合や per_run が 0 以下・クエリ数以上の場合は全クエリを返す。
+    """
+    if len(_catalog()) == 0 or per_run <= 0 or per_run >= len(queries):
+        return list(queries)
+    slices = math.ceil(len(queries) / per_run)
+    index = (now.toordinal() // 7) % slices
+    return queries[index * per_run:(index + 1) * per_run]
+
+
+def update_catalog(places_by_query: dict[str, list[dict]], now: datetime) -> int:
+    """検索結果をカタログに反映する。
+
+    Args:
+        places_by_query: {query: そのクエリで見つかった place のリスト}
+        now: 更新時刻
+
+    Returns:
+        新規に追加したレストラン数
+    """
+    catalog = _catalog()
+    timestamp = now.isoformat()
+    added = 0
+
+    merged: dict[str, dict] = {}
+    for query, places in places_by_query.items():
+        for place in places:
+            place_id = place.get("id", "")
+            if not place_id:
+                continue
+            entry = merged.get(place_id)
+            if entry is None:
+                existing = catalog.get(place_id)
+                if existing is None:
+                    added += 1
+                    entry = {"first_seen": timestamp, "queries": []}
+                else:
+                    entry = {
+                        "first_seen": existing.get("first_seen", timestamp),
+                        "queries": list(existing.get("queries", [])),
+                    }
+                merged[place_id] = entry
+            entry["place"] = place
+            entry["last_refreshed"] = timestamp
+            if query not in entry["queries"]:
+                entry["queries"].append(query)
+
+    catalog.put_many(merged)
+    logger.info(
+        f"カタログ更新: {len(merged)}件を更新（新規 {added}件, 合計 {len(catalog)}件）"
+    )
+    return added
+
+
+def load_catalog_places(
+    now: datetime,
+    max_age_days: int = 60,
+    min_rating: float = 0.0,
+) -> list[dict]:
+    """カタログから候補となる place のリストを返す。
+
+    max_age_days 日以上どの検索にも出てこないレストラン（閉店等）と、
+    最新の評価が min_rating 未満のレストランは除く。
+    順序は初回発見順（同時刻は place_id 順）で、実行ごとに変わらない。
+    """
+    cutoff = now - timedelta(days=max_age_days)
+    rows = []
+    for place_id, entry in _catalog().items():
+        last_refreshed = entry.get("last_refreshed", "")
+        if not last_refreshed or datetime.fromisoformat(last_refreshed) < cutoff:
+            continue
+        place = entry.get("place", {})
+        if place.get("rating", 0) < min_rating:
+            continue
+        rows.append((entry.get("first_seen", ""), place_id, place))
+
+    rows.sort(key=lambda r: (r[0], r[1]))
+    logger.info(f"カタログから候補読み込み: {len(rows)}件")
+    return [place for _, _, place in rows]
@@ -1,15 +1,18 @@
 """Google Places API (New) クライアント"""
 import logging
-import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-import requests
-
-from backend.config import get_api_key
+from backend import http_client, metrics
+from backend.cache_store import CacheStore, get_store
+from backend.config import DETAILS_CACHE_FILE, PLACES_API_BASE_URL, get_api_key
+from backend.rate_limit import RateLimiter
 
 logger = logging.getLogger(__name__)
 
-BASE_URL = "https://places.googleapis.com/v1"
+JST = timezone(timedelta(hours=9))
+BASE_URL = PLACES_API_BASE_URL
 
 # Places API (New) で取得するフィールド
 SEARCH_FIELDS = [
@@ -46,6 +49,20 @@ DETAIL_FIELDS = [
     "paymentOptions",
 ]
 
+# 変化しやすいフィールド（短い TTL でキャッシュ）。それ以外は長い TTL
+VOLATILE_DETAIL_FIELDS = frozenset({
+    "rating",
+    "userRatingCount",
+    "regularOpeningHours",
+    "reviews",
+})
+
+# キャッシュしないフィールド（毎回取得する）。写真のリソース名は期限切れになり、
+# Google もキャッシュしないよう求めているため
+UNCACHED_DETAIL_FIELDS = frozenset({
+    "photos",
+})
+
 
 def _headers() -> dict:
     return {
@@ -87,73 +104,165 @@ def search_restaurants(
     if page_token:
         body["pageToken"] = page_token
 
-    resp = requests.post(url, json=body, headers=headers, timeout=30)
+    resp = http_client.post(url, json=body, headers=headers, timeout=30)
     resp.raise_for_status()
     return resp.json()
 
 
-def search_all_restaurants(
+def _search_query_pages(
+    query: str,
+    lat: float,
+    lng: float,
+    radius_meters: int,
+    min_rating: float,
+    max_pages: int,
+    rate_limiter: RateLimiter,
+) -> list[dict]:
+    """1クエリ分の検索結果をページを辿って取得する（ページ順を保持）。"""
+    places: list[dict] = []
+    page_token = None
+
+    for page in range(max_pages):
+        rate_limiter.acquire()
+        try:
+            result = search_restaurants(
+                query=query,
+                lat=lat,
+                lng=lng,
+                radius_meters=radius_meters,
+                min_rating=min_rating,
+                page_token=page_token,
+            )
+        except Exception as e:
+            logger.warning(f"  検索エラー ('{query}' page {page}): {e}")
+            break
+
+        places.extend(result.get("places", []))
+
+        page_token = result.get("nextPageToken")
+        if not page_token:
+            break
+
+    return places
+
+
+def search_restaurants_by_query(
     queries: list[str],
     lat: float,
     lng: float,
     radius_meters: int = 30000,
     min_rating: float = 4.0,
     max_pages_per_query: int = 3,
-) -> list[dict]:
-    """複数クエリで検索し、重複を除いた全候補を返す。"""
+    max_workers: int = 6,
+    rate_per_second: float = 5.0,
+) -> dict[str, list[dict]]:
+    """複数クエリを並列に検索し、クエリごとの結果（重複除去前）を返す。
+
+    クエリは最大 max_workers 並列で検索し（ページ送りは各クエリ内で順に行う）、
+    Text Search の呼び出しは全クエリ共通で rate_per_second に制限する。
+
+    Returns:
+        {query: ページ順の place リスト}（queries と同じ順序）
+    """
+    logger.info(f"検索中: {len(queries)}クエリ (並列数 {max_workers})")
+    limiter = RateLimiter(rate_per_second)
+
+    def _run(query: str) -> list[dict]:
+        return _search_query_pages(
+            query, lat, lng, radius_meters, min_rating, max_pages_per_query, limiter,
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        return dict(zip(queries, executor.map(_run, queries)))
+
+
+def dedupe_places(places_by_query: dict[str, list[dict]]) -> list[dict]:
+    """クエリ順・ページ順に見て、最初に出てきた place だけを残す。"""
     seen_ids = set()
     all_places = []
-
-    for query in queries:
-        logger.info(f"検索中: '{query}'")
-        page_token = None
-        query_count = 0
-
-        for page in range(max_pages_per_query):
-            try:
-                result = search_restaurants(
-                    query=query,
-                    lat=lat,
-                    lng=lng,
-                    radius_meters=radius_meters,
-                    min_rating=min_rating,
-                    page_token=page_token,
-                )
-            except Exception as e:
-                logger.warning(f"  検索エラー ('{query}' page {page}): {e}")
-                break
-
-            places = result.get("places", [])
-            query_count += len(places)
-            for place in places:
-                place_id = place.get("id", "")
-                if place_id and place_id not in seen_ids:
-                    seen_ids.add(place_id)
-                    all_places.append(place)
-
-            page_token = result.get("nextPageToken")
-            if not page_token:
-                break
-            time.sleep(0.5)
-
-        logger.info(f"  → {query_count}件取得 (累計ユニーク: {len(all_places)}件)")
-        time.sleep(1)  # クエリ間のウェイト
-
-    logger.info(f"検索完了: 合計 {len(all_places)} 件のユニーク候補")
+    for query, places in places_by_query.items():
+        for place in places:
+            place_id = place.get("id", "")
+            if place_id and place_id not in seen_ids:
+                seen_ids.add(place_id)
+                all_places.append(place)
+        logger.info(
+            f"  '{query}' → {len(places)}件取得 (累計ユニーク: {len(all_places)}件)"
+        )
     return all_places
 
 
-def get_place_details(place_id: str) -> dict:
-    """Place Details (New) で詳細情報を取得する。"""
+def _details_cache() -> CacheStore:
+    """Place Details キャッシュのストアを返す（初回のみ読み込み）。"""
+    return get_store(DETAILS_CACHE_FILE)
+
+
+def _fetch_place_details(place_id: str, fields: list[str]) -> dict:
+    """Place Details (New) を指定フィールドだけ取得する。"""
     url = f"{BASE_URL}/places/{place_id}"
     headers = _headers()
-    headers["X-Goog-FieldMask"] = ",".join(DETAIL_FIELDS)
+    headers["X-Goog-FieldMask"] = ",".join(fields)
 
-    resp = requests.get(url, headers=headers, params={"languageCode": "ja"}, timeout=30)
+    resp = http_client.get(url, headers=headers, params={"languageCode": "ja"}, timeout=30)
     resp.raise_for_status()
     return resp.json()
 
 
+def get_place_details(
+    place_id: str,
+    stable_ttl_days: int = 180,
+    volatile_ttl_days: int = 7,
+) -> dict:
+    """Place Details (New) で詳細情報を取得する（フィールド単位の TTL キャッシュ付き）。
+
+    住所・電話番号などの変化しにくいフィールドは stable_ttl_days 日、
+    評価・営業時間・口コミなどの変化しやすいフィールドは volatile_ttl_days 日
+    キャッシュする。期限切れのフィールドと、キャッシュしない写真（UNCACHED_DETAIL_FIELDS）
+    だけをフィールドマスクで絞って取得する。
+    """
+    cache = _details_cache()
+    now = datetime.now(JST)
+    cached_fields: dict = {
+        field: cached
+        for field, cached in (cache.get(place_id) or {}).get("fields", {}).items()
+        if field not in UNCACHED_DETAIL_FIELDS
+    }
+
+    stale = []
+    for field in DETAIL_FIELDS:
+        if field in UNCACHED_DETAIL_FIELDS:
+            continue
+        ttl_days = volatile_ttl_days if field in VOLATILE_DETAIL_FIELDS else stable_ttl_days
+        cached = cached_fields.get(field)
+        if (cached is None
+                or now - datetime.fromisoformat(cached["fetched_at"]) >= timedelta(days=ttl_days)):
+            stale.append(field)
+
+    metrics.record_cache("details", hit=not stale)
+    fields_to_fetch = stale + [f for f in DETAIL_FIELDS if f in UNCACHED_DETAIL_FIELDS]
+    logger.debug(
+        f"Place Details 取得 ({place_id}): {len(fields_to_fetch)}/{len(DETAIL_FIELDS)}フィールド"
+    )
+    data = _fetch_place_details(place_id, fields_to_fetch)
+    if stale:
+        fetched_at = now.isoformat()
+        cached_fields = dict(cached_fields)
+        for field in stale:
+            # レスポンスにないフィールド（未登録の電話番号など）も None として記録する
+            cached_fields[field] = {"value": data.get(field), "fetched_at": fetched_at}
+        cache.put(place_id, {"fields": cached_fields})
+
+    details = {
+        field: cached_fields[field]["value"]
+        for field in DETAIL_FIELDS
+        if cached_fields.get(field, {}).get("value") is not None
+    }
+    for field in UNCACHED_DETAIL_FIELDS:
+        if data.get(field) is not None:
+            details[field] = data[field]
+    return details
+
+
 def get_photo_url(photo_name: str, max_width: int = 800) -> str:
     """写真のダウンロードURLを取得する。
 
@@ -172,7 +281,7 @@ def get_photo_url(photo_name: str, max_width: int = 800) -> str:
     # skipHttpRedirect=true で URL を JSON で取得
     params["skipHttpRedirect"] = "true"
 
-    resp = requests.get(url, params=params, timeout=30)
+    resp = http_client.get(url, params=params, timeout=30)
     resp.raise_for_status()
     data = resp.json()
     return data.get("photoUri", "")
@@ -0,0 +1,28 @@
+"""API 呼び出しのレート制限（スレッド間で共有）"""
+import threading
+import time
+
+
+class RateLimiter:
+    """1秒あたりの呼び出し回数を制限するレートリミッタ。
+
+    acquire() は前回の呼び出しから 1 / per_second 秒以上空くまで待機する。
+    複数スレッドから同じインスタンスを共有して使う。
+    per_second が 0 以下の場合は制限しない。
+    """
+
+    def __init__(self, per_second: float):
+        self.interval = 1.0 / per_second if per_second > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def acquire(self) -> None:
+        """呼び出し枠が空くまで待機する。"""
+        if self.interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.interval
+        if wait > 0:
+            time.sleep(wait)
@@ -1,10 +1,15 @@
 """レストラン選定ロジック: フィルタリング・予算分類・重み付きランダム選定"""
+import heapq
 import json
 import logging
+import math
 import random
 from datetime import datetime, timedelta, timezone
 
-from backend.config import VISITED_FILE, HISTORY_FILE
+import numpy as np
+
+from backend.config import VISITED_FILE
+from backend.history_index import load_history_index
 
 logger = logging.getLogger(__name__)
 
@@ -30,22 +35,31 @@ def load_visited_ids() -> set[str]:
         return set()
 
 
-def load_recent_history(weeks: int = 4) -> set[str]:
-    """直近N週に推薦済みの place_id セットを読み込む。"""
-    try:
-        with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return set()
+def load_recent_history(weeks: int = 4, index: dict[str, dict] | None = None) -> set[str]:
+    """直近N週に推薦済みの place_id セットを読み込む。
+
+    history.json 全体ではなく推薦履歴の索引（最終推薦日時）から求める。
+    """
+    if index is None:
+        index = load_history_index()
 
     cutoff = datetime.now(JST) - timedelta(weeks=weeks)
-    recent_ids = set()
-    for week in data.get("weeks", []):
-        week_date = datetime.fromisoformat(week["generated_at"])
-        if week_date >= cutoff:
-            for r in week.get("restaurants", []):
-                recent_ids.add(r["place_id"])
-    return recent_ids
+    return {
+        place_id
+        for place_id, entry in index.items()
+        if datetime.fromisoformat(entry["last_recommended_at"]) >= cutoff
+    }
+
+
+def was_ever_recommended(place_id: str, index: dict[str, dict]) -> bool:
+    """過去に一度でも推薦したことがあるかを返す。"""
+    return place_id in index
+
+
+def recommendation_count(place_id: str, index: dict[str, dict]) -> int:
+    """これまでの推薦回数を返す。"""
+    entry = index.get(place_id)
+    return entry["count"] if entry else 0
 
 
 def classify_budget(
@@ -160,33 +174,76 @@ def filter_candidates(
     return filtered
 
 
-def weighted_random_pick(candidates: list[dict], count: int) -> list[dict]:
-    """評価で重み付けしたランダム選定。
+def _rating_weight(candidate: dict) -> float:
+    """選定の重み: rating の2乗（高評価をやや優遇）。"""
+    rating = candidate.get("rating", 4.0)
+    return rating ** 2
+
+
+def weighted_random_pick(
+    candidates: list[dict],
+    count: int,
+    rng: random.Random | int | None = None,
+    backend: str = "python",
+) -> list[dict]:
+    """評価で重み付けしたランダム選定（非復元抽出）。
 
     高評価ほど選ばれやすいが、完全に評価順ではない。
+
+    Efraimidis–Spirakis の重み付きリザーバサンプリングで、各候補に
+    キー log(u) / w（u は (0, 1] の一様乱数、w は重み）を付けて上位 count 件を取る。
+    重みに比例して1件ずつ抜き取る逐次抽出と同じ分布になり、
+    返す順序（キーの降順）も逐次抽出で選ばれる順序と同じ分布に従う。
+    計算量は O(n log k)。
+
+    Args:
+        candidates: 候補リスト
+        count: 選ぶ件数
+        rng: random.Random インスタンスまたはシード値（None なら毎回ランダム）
+        backend: "python"（heapq）または "numpy"（大きな候補集合向け）
+
+    Returns:
+        選ばれた候補のリスト
     """
     if len(candidates) <= count:
         return candidates
+    if count <= 0:
+        return []
+
+    if not isinstance(rng, random.Random):
+        rng = random.Random(rng)
 
-    # 重み: rating の2乗（高評価をやや優遇）
-    weights = []
-    for c in candidates:
-        rating = c.get("rating", 4.0)
-        weights.append(rating ** 2)
-
-    selected = []
-    remaining = list(range(len(candidates)))
-    remaining_weights = list(weights)
-
-    for _ in range(count):
-        if not remaining:
-            break
-        chosen_idx = random.choices(
-            remaining, weights=remaining_weights, k=1
-        )[0]
-        pos = remaining.index(chosen_idx)
-        selected.append(candidates[chosen_idx])
-        remaining.pop(pos)
-        remaining_weights.pop(pos)
-
-    return selected
+    if backend == "numpy":
+        return _weighted_pick_numpy(candidates, count, rng)
+    if backend != "python":
+        raise ValueError(f"未対応の backend です: {backend}")
+
+    def _key(candidate: dict) -> float:
+        weight = _rating_weight(candidate)
+        if weight <= 0:
+            return -math.inf
+        return math.log(1.0 - rng.random()) / weight
+
+    keyed = ((_key(c), i) for i, c in enumerate(candidates))
+    return [candidates[i] for _, i in heapq.nlargest(count, keyed)]
+
+
+def _weighted_pick_numpy(
+    candidates: list[dict],
+    count: int,
+    rng: random.Random,
+) -> list[dict]:
+    """weighted_random_pick の NumPy 実装。"""
+    generator = np.random.default_rng(rng.getrandbits(64))
+    weights = np.fromiter(
+        (_rating_weight(c) for c in candidates), dtype=np.float64, count=len(candidates),
+    )
+    with np.errstate(divide="ignore"):
+        keys = np.where(
+            weights > 0,
+            np.log(1.0 - generator.random(len(candidates))) / weights,
+            -np.inf,
+        )
+    top = np.argpartition(-keys, count - 1)[:count]
+    top = top[np.argsort(-keys[top], kind="stable")]
+    return [candidates[i] for i in top]
@@ -3,22 +3,30 @@
 TRANSIT モードは日本地域で空レスポンスを返すため、
 DRIVE モードの所要時間 × 1.5 で公共交通機関の目安を推定する。
 """
-import json
 import logging
-import math
 import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
-import requests
+import numpy as np
 
-from backend.config import get_api_key, STATION_CACHE_FILE
+from backend import http_client, metrics
+from backend.cache_store import CacheStore, get_store
+from backend.config import (
+    get_api_key, CACHE_STORE_FILE, PLACES_API_BASE_URL, ROUTES_API_BASE_URL, STATION_CACHE_FILE,
+)
+from backend.geo import GridIndex, haversine_km, haversine_km_many
+from backend.rate_limit import RateLimiter
+from backend.station_locator import format_station, get_locator
 
 logger = logging.getLogger(__name__)
 
 JST = timezone(timedelta(hours=9))
-ROUTES_URL = "https://routes.googleapis.com/directions/v2:computeRoutes"
-PLACES_BASE_URL = "https://places.googleapis.com/v1"
+ROUTES_URL = f"{ROUTES_API_BASE_URL}/directions/v2:computeRoutes"
+ROUTE_MATRIX_URL = f"{ROUTES_API_BASE_URL}/distanceMatrix/v2:computeRouteMatrix"
+PLACES_BASE_URL = PLACES_API_BASE_URL
 NEARBY_URL = f"{PLACES_BASE_URL}/places:searchNearby"
 
 # 車での所要時間に対する公共交通機関の係数
@@ -28,6 +36,23 @@ TRANSIT_MULTIPLIER = 1.5
 BICYCLE_MAX_KM = 5.0
 BICYCLE_MIN_PER_KM = 4
 
+# 徒歩圏内とみなす直線距離（km）。これ以内は API を呼ばない
+WALK_MAX_KM = 1.5
+
+# 事前フィルタで想定する車の平均速度の上限（km/h）。
+# 道路距離は直線距離以上なので、公共交通機関の推定所要時間は
+# 直線距離 / この速度 × TRANSIT_MULTIPLIER を下回らない
+PREFILTER_MAX_DRIVE_KMH = 80
+
+# 徒歩圏外での推定所要時間の下限（直線距離1kmあたりの分）。
+# DRIVE 換算（× TRANSIT_MULTIPLIER）も直線距離ベースのフォールバック（1kmあたり3分）も
+# これを下回らない
+MIN_TRAVEL_MIN_PER_KM = 60 / PREFILTER_MAX_DRIVE_KMH * TRANSIT_MULTIPLIER
+
+# Route Matrix 1リクエストあたりの目的地数（API上限は 625 要素。
+# 失敗時の再計算範囲を小さくし、チャンク単位で並列化できるよう小さめに分割する）
+MATRIX_MAX_DESTINATIONS = 100
+
 
 def _bicycle_minutes(distance_km: float) -> int | None:
     """5km以内であれば自転車での所要時間（分）を返す。範囲外は None。"""
@@ -36,19 +61,43 @@ def _bicycle_minutes(distance_km: float) -> int | None:
     return max(1, round(distance_km * BICYCLE_MIN_PER_KM))
 
 
-def _load_cache() -> dict:
-    """キャッシュファイルを読み込む。"""
-    try:
-        with open(STATION_CACHE_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {}
+# 最寄り駅を探す半径（m）
+STATION_SEARCH_RADIUS_M = 1000.0
+
+# 最寄り駅キャッシュの空間インデックス（_station_index で遅延構築）
+STATION_KEY_PREFIX = "station:"
+STATION_ID_KEY_PREFIX = "station_id:"
+_station_grid: GridIndex | None = None
+_station_grid_lock = threading.Lock()
+
+
+def _cache() -> CacheStore:
+    """移動時間・最寄り駅のキャッシュストアを返す（初回のみ読み込み）。
+
+    旧形式の station_cache.json しかない場合は初回に一度だけ移行する。
+    """
+    return get_store(CACHE_STORE_FILE, legacy_json=STATION_CACHE_FILE)
 
 
-def _save_cache(cache: dict) -> None:
-    """キャッシュファイルに書き込む。"""
-    with open(STATION_CACHE_FILE, "w", encoding="utf-8") as f:
-        json.dump(cache, f, ensure_ascii=False, indent=2)
+def _station_index() -> GridIndex:
+    """キャッシュ済みの最寄り駅の問い合わせ地点を登録した空間インデックスを返す。
+
+    キーの "station:lat,lng" から座標を復元し、プロセス内で1回だけ構築する。
+    """
+    global _station_grid
+    with _station_grid_lock:
+        if _station_grid is None:
+            grid = GridIndex()
+            for key, _ in _cache().items():
+                if not key.startswith(STATION_KEY_PREFIX):
+                    continue
+                try:
+                    lat_str, lng_str = key[len(STATION_KEY_PREFIX):].split(",")
+                    grid.insert(float(lat_str), float(lng_str), key)
+                except ValueError:
+                    continue
+            _station_grid = grid
+        return _station_grid
 
 
 def _is_cache_valid(entry: dict, expiry_days: int) -> bool:
@@ -62,13 +111,79 @@ def _is_cache_valid(entry: dict, expiry_days: int) -> bool:
 
 def _haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
     """2点間の直線距離（km）を計算する。"""
-    R = 6371
-    dlat = math.radians(lat2 - lat1)
-    dlng = math.radians(lng2 - lng1)
-    a = (math.sin(dlat / 2) ** 2 +
-         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
-         math.sin(dlng / 2) ** 2)
-    return R * 2 * math.asin(math.sqrt(a))
+    return haversine_km(lat1, lng1, lat2, lng2)
+
+
+def _walk_result(distance_km: float) -> dict:
+    """徒歩圏内の移動情報を返す。"""
+    walk_minutes = round(distance_km / 0.08)  # 時速4.8km = 分速0.08km
+    bike_minutes = _bicycle_minutes(distance_km)
+    summary = f"徒歩 {walk_minutes}分"
+    if bike_minutes is not None:
+        summary += f"／自転車 約{bike_minutes}分"
+    return {
+        "travel_time_minutes": walk_minutes,
+        "travel_cost_yen": 0,
+        "travel_bicycle_minutes": bike_minutes,
+        "travel_summary": summary,
+    }
+
+
+def _estimated_result(distance_km: float) -> dict:
+    """ルートが見つからない場合に直線距離から推定した移動情報を返す。"""
+    est_minutes = round(distance_km * 3)  # 1km あたり約3分（電車）
+    bike_minutes = _bicycle_minutes(distance_km)
+    summary = f"推定 {est_minutes}分（直線{distance_km:.1f}km）"
+    if bike_minutes is not None:
+        summary += f"／自転車 約{bike_minutes}分"
+    return {
+        "travel_time_minutes": est_minutes,
+        "travel_cost_yen": None,
+        "travel_bicycle_minutes": bike_minutes,
+        "travel_summary": summary,
+    }
+
+
+def _estimate_fare(distance_km: float) -> int:
+    """距離から電車運賃（円）を推定する。"""
+    # 東京近郊の電車: 初乗り~140円、10km~200円、20km~400円、30km~500円
+    if distance_km <= 5:
+        fare_estimate = 180
+    elif distance_km <= 15:
+        fare_estimate = round(150 + distance_km * 15)
+    elif distance_km <= 30:
+        fare_estimate = round(200 + distance_km * 12)
+    else:
+        fare_estimate = round(250 + distance_km * 10)
+    # 10円単位に丸め
+    return round(fare_estimate / 10) * 10
+
+
+def _drive_result(duration_str: str, distance_m: int) -> dict:
+    """DRIVE の所要時間・走行距離から公共交通機関の目安を組み立てる。"""
+    drive_seconds = int(duration_str.rstrip("s"))
+    # 車の所要時間 × 係数 = 公共交通機関の推定
+    transit_minutes = round(drive_seconds / 60 * TRANSIT_MULTIPLIER)
+
+    distance_km_road = distance_m / 1000
+    fare_estimate = _estimate_fare(distance_km_road)
+
+    # 走行距離が5km以内なら自転車での所要時間を併記
+    bike_minutes = _bicycle_minutes(distance_km_road)
+    summary = f"公共交通機関 約{transit_minutes}分（{distance_km_road:.0f}km）"
+    if bike_minutes is not None:
+        summary += f"／自転車 約{bike_minutes}分"
+
+    return {
+        "travel_time_minutes": transit_minutes,
+        "travel_cost_yen": fare_estimate,
+        "travel_bicycle_minutes": bike_minutes,
+        "travel_summary": summary,
+    }
+
+
+def _lat_lng_waypoint(lat: float, lng: float) -> dict:
+    return {"location": {"latLng": {"latitude": lat, "longitude": lng}}}
 
 
 def compute_travel_time(
@@ -76,31 +191,25 @@ def compute_travel_time(
     origin_lng: float,
     dest_lat: float,
     dest_lng: float,
+    rate_limiter: RateLimiter | None = None,
 ) -> dict:
     """Routes API (DRIVE) で移動時間を計算し、公共交通機関の目安に変換する。
 
+    rate_limiter を渡すと API 呼び出しの直前に acquire() する（徒歩圏内は呼ばない）。
+
     Returns:
         {
             "travel_time_minutes": int,
             "travel_cost_yen": int | None,
+            "travel_bicycle_minutes": int | None,
             "travel_summary": str,
         }
     """
     distance_km = _haversine_km(origin_lat, origin_lng, dest_lat, dest_lng)
 
     # 徒歩圏内（1.5km以内）
-    if distance_km <= 1.5:
-        walk_minutes = round(distance_km / 0.08)  # 時速4.8km = 分速0.08km
-        bike_minutes = _bicycle_minutes(distance_km)
-        summary = f"徒歩 {walk_minutes}分"
-        if bike_minutes is not None:
-            summary += f"／自転車 約{bike_minutes}分"
-        return {
-            "travel_time_minutes": walk_minutes,
-            "travel_cost_yen": 0,
-            "travel_bicycle_minutes": bike_minutes,
-            "travel_summary": summary,
-        }
+    if distance_km <= WALK_MAX_KM:
+        return _walk_result(distance_km)
 
     headers = {
         "Content-Type": "application/json",
@@ -109,111 +218,329 @@ def compute_travel_time(
     }
 
     body = {
-        "origin": {
-            "location": {
-                "latLng": {"latitude": origin_lat, "longitude": origin_lng}
-            }
-        },
-        "destination": {
-            "location": {
-                "latLng": {"latitude": dest_lat, "longitude": dest_lng}
-            }
-        },
+        "origin": _lat_lng_waypoint(origin_lat, origin_lng),
+        "destination": _lat_lng_waypoint(dest_lat, dest_lng),
         "travelMode": "DRIVE",
         "languageCode": "ja",
     }
 
-    resp = requests.post(ROUTES_URL, json=body, headers=headers, timeout=30)
+    if rate_limiter is not None:
+        rate_limiter.acquire()
+    resp = http_client.post(ROUTES_URL, json=body, headers=headers, timeout=30)
     resp.raise_for_status()
     data = resp.json()
 
     routes = data.get("routes", [])
     if not routes:
         # フォールバック: 直線距離から推定
-        est_minutes = round(distance_km * 3)  # 1km あたり約3分（電車）
-        bike_minutes = _bicycle_minutes(distance_km)
-        summary = f"推定 {est_minutes}分（直線{distance_km:.1f}km）"
-        if bike_minutes is not None:
-            summary += f"／自転車 約{bike_minutes}分"
-        return {
-            "travel_time_minutes": est_minutes,
-            "travel_cost_yen": None,
-            "travel_bicycle_minutes": bike_minutes,
-            "travel_summary": summary,
-        }
+        return _estimated_result(distance_km)
 
     route = routes[0]
-    duration_str = route.get("duration", "0s")
-    drive_seconds = int(duration_str.rstrip("s"))
-    # 車の所要時間 × 係数 = 公共交通機関の推定
-    transit_minutes = round(drive_seconds / 60 * TRANSIT_MULTIPLIER)
+    return _drive_result(route.get("duration", "0s"), route.get("distanceMeters", 0))
 
-    distance_m = route.get("distanceMeters", 0)
-    distance_km_road = distance_m / 1000
 
-    # 運賃の推定（距離ベース）
-    # 東京近郊の電車: 初乗り~140円、10km~200円、20km~400円、30km~500円
-    if distance_km_road <= 5:
-        fare_estimate = 180
-    elif distance_km_road <= 15:
-        fare_estimate = round(150 + distance_km_road * 15)
-    elif distance_km_road <= 30:
-        fare_estimate = round(200 + distance_km_road * 12)
-    else:
-        fare_estimate = round(250 + distance_km_road * 10)
-    # 10円単位に丸め
-    fare_estimate = round(fare_estimate / 10) * 10
+def compute_travel_times_matrix(
+    origin_lat: float,
+    origin_lng: float,
+    destinations: list[tuple[str, float, float]],
+    rate_limiter: RateLimiter | None = None,
+) -> dict[str, dict]:
+    """Route Matrix API (DRIVE) で1出発地→複数目的地の移動情報をまとめて計算する。
 
-    # 走行距離が5km以内なら自転車での所要時間を併記
-    bike_minutes = _bicycle_minutes(distance_km_road)
-    summary = f"公共交通機関 約{transit_minutes}分（{distance_km_road:.0f}km）"
-    if bike_minutes is not None:
-        summary += f"／自転車 約{bike_minutes}分"
+    徒歩圏内の目的地は API を呼ばずに計算する。それ以外は
+    MATRIX_MAX_DESTINATIONS 件ずつに分割して computeRouteMatrix を呼ぶ。
+    各エントリの形式・計算方法は compute_travel_time と同じ。
+
+    Args:
+        destinations: (key, dest_lat, dest_lng) のリスト
+
+    Returns:
+        {key: travel_info_dict}。要素単位でエラーになった目的地は含まない。
+    """
+    results: dict[str, dict] = {}
+    remote: list[tuple[str, float, float, float]] = []
+    for key, dest_lat, dest_lng in destinations:
+        distance_km = _haversine_km(origin_lat, origin_lng, dest_lat, dest_lng)
+        if distance_km <= WALK_MAX_KM:
+            results[key] = _walk_result(distance_km)
+        else:
+            remote.append((key, dest_lat, dest_lng, distance_km))
+
+    if not remote:
+        return results
+
+    headers = {
+        "Content-Type": "application/json",
+        "X-Goog-Api-Key": get_api_key(),
+        "X-Goog-FieldMask": (
+            "originIndex,destinationIndex,status,condition,duration,distanceMeters"
+        ),
+    }
+
+    for start in range(0, len(remote), MATRIX_MAX_DESTINATIONS):
+        chunk = remote[start:start + MATRIX_MAX_DESTINATIONS]
+        body = {
+            "origins": [{"waypoint": _lat_lng_waypoint(origin_lat, origin_lng)}],
+            "destinations": [
+                {"waypoint": _lat_lng_waypoint(lat, lng)} for _, lat, lng, _ in chunk
+            ],
+            "travelMode": "DRIVE",
+            "languageCode": "ja",
+        }
+
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        resp = http_client.post(ROUTE_MATRIX_URL, json=body, headers=headers, timeout=60)
+        resp.raise_for_status()
+
+        # レスポンスは要素ごとの JSON 配列（順不同、0 のインデックスは省略される）
+        for element in resp.json():
+            dest_index = element.get("destinationIndex", 0)
+            if not 0 <= dest_index < len(chunk):
+                continue
+            key, _, _, distance_km = chunk[dest_index]
+
+            status = element.get("status") or {}
+            if status.get("code", 0) != 0:
+                logger.debug(f"Route Matrix 要素エラー ({key}): {status.get('message', '')}")
+                continue
+
+            if element.get("condition") == "ROUTE_EXISTS":
+                results[key] = _drive_result(
+                    element.get("duration", "0s"), element.get("distanceMeters", 0)
+                )
+            else:
+                # compute_travel_time でルートが空だった場合と同じフォールバック
+                results[key] = _estimated_result(distance_km)
+
+    return results
+
+
+def _is_travel_cache_hit(entry: dict | None, cache_expiry_days: int) -> bool:
+    """移動時間キャッシュのエントリがそのまま使えるか（travel_time_minutes が null なら取り直す）。"""
+    return (entry is not None
+            and _is_cache_valid(entry, cache_expiry_days)
+            and entry.get("travel_time_minutes") is not None)
+
+
+def estimate_travel_batch(
+    origin_lat: float,
+    origin_lng: float,
+    lats: np.ndarray,
+    lngs: np.ndarray,
+) -> dict[str, np.ndarray]:
+    """全候補の座標配列から、直線距離ベースの移動情報を NumPy で一括計算する。
+
+    各値はスカラー版（_walk_result / _estimated_result / _bicycle_minutes /
+    _estimate_fare）と同じ式・同じ丸め（偶数丸め）で求める。
+    運賃は道路距離の代わりに直線距離で推定する。
+
+    Returns:
+        {
+            "distance_km": float[],        直線距離
+            "walkable": bool[],            徒歩圏内（WALK_MAX_KM 以内）か
+            "walk_minutes": int[],         徒歩の所要時間
+            "bikeable": bool[],            自転車を併記する距離（BICYCLE_MAX_KM 以内）か
+            "bicycle_minutes": int[],      自転車の所要時間（bikeable でない要素は 0）
+            "fallback_minutes": int[],     ルートがない場合の推定所要時間
+            "min_travel_minutes": float[], 徒歩圏外での所要時間の下限（MIN_TRAVEL_MIN_PER_KM）
+            "fare_yen": int[],             推定運賃
+        }
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lngs = np.asarray(lngs, dtype=np.float64)
+    distance_km = haversine_km_many(origin_lat, origin_lng, lats, lngs)
+
+    bikeable = distance_km <= BICYCLE_MAX_KM
+    bicycle_minutes = np.where(
+        bikeable, np.maximum(1, np.rint(distance_km * BICYCLE_MIN_PER_KM)), 0,
+    )
+
+    fare = np.select(
+        [distance_km <= 5, distance_km <= 15, distance_km <= 30],
+        [
+            np.full_like(distance_km, 180.0),
+            np.rint(150 + distance_km * 15),
+            np.rint(200 + distance_km * 12),
+        ],
+        default=np.rint(250 + distance_km * 10),
+    )
 
     return {
-        "travel_time_minutes": transit_minutes,
-        "travel_cost_yen": fare_estimate,
-        "travel_bicycle_minutes": bike_minutes,
-        "travel_summary": summary,
+        "distance_km": distance_km,
+        "walkable": distance_km <= WALK_MAX_KM,
+        "walk_minutes": np.rint(distance_km / 0.08).astype(np.int64),
+        "bikeable": bikeable,
+        "bicycle_minutes": bicycle_minutes.astype(np.int64),
+        "fallback_minutes": np.rint(distance_km * 3).astype(np.int64),
+        "min_travel_minutes": distance_km * MIN_TRAVEL_MIN_PER_KM,
+        "fare_yen": (np.rint(fare / 10) * 10).astype(np.int64),
     }
 
 
-def get_travel_info(
-    place_id: str,
+def prefilter_destinations(
+    destinations: list[tuple[str, float, float]],
     origin_lat: float,
     origin_lng: float,
-    dest_lat: float,
-    dest_lng: float,
+    max_travel_minutes: int,
     cache_expiry_days: int = 90,
-) -> dict:
-    """キャッシュ付きで移動時間情報を取得する。"""
-    cache = _load_cache()
-
-    # キャッシュチェック（travel_time_minutes が null のエントリはリトライ）
-    if place_id in cache:
-        entry = cache[place_id]
-        if (_is_cache_valid(entry, cache_expiry_days)
-                and entry.get("travel_time_minutes") is not None):
-            logger.debug(f"キャッシュヒット: {place_id}")
-            return entry
-
-    # API呼び出し
-    logger.info(f"Routes API 呼び出し: {place_id}")
-    result = compute_travel_time(origin_lat, origin_lng, dest_lat, dest_lng)
-    result["cached_at"] = datetime.now(JST).isoformat()
-
-    # キャッシュ保存
-    cache[place_id] = result
-    _save_cache(cache)
-
-    time.sleep(0.2)  # レート制限対策
-    return result
+) -> tuple[list[tuple[str, float, float]], dict[str, dict], set[str]]:
+    """Routes API を呼ぶ前に直線距離だけで目的地を振り分ける。
+
+    - 徒歩圏内: compute_travel_time と同じ徒歩の移動情報をその場で確定する
+    - 所要時間の下限が max_travel_minutes を超える: 除外する
+    - それ以外: Routes API で計算が必要
+
+    ログには、除外した目的地のうち移動時間キャッシュ（cache_expiry_days 日）に
+    なかったもの、つまり実際に節約した Route Matrix の要素数を出す。
+
+    Returns:
+        (要計算の destinations, {place_id: 徒歩の移動情報}, 除外した place_id の集合)
+    """
+    remaining: list[tuple[str, float, float]] = []
+    walk_results: dict[str, dict] = {}
+    rejected: set[str] = set()
+
+    if destinations:
+        estimate = estimate_travel_batch(
+            origin_lat,
+            origin_lng,
+            [lat for _, lat, _ in destinations],
+            [lng for _, _, lng in destinations],
+        )
+        out_of_range = estimate["min_travel_minutes"] > max_travel_minutes
+        for i, dest in enumerate(destinations):
+            if estimate["walkable"][i]:
+                walk_results[dest[0]] = _walk_result(float(estimate["distance_km"][i]))
+            elif out_of_range[i]:
+                rejected.add(dest[0])
+            else:
+                remaining.append(dest)
+
+    cache = _cache()
+    saved_elements = sum(
+        1 for place_id in rejected
+        if not _is_travel_cache_hit(cache.get(place_id), cache_expiry_days)
+    )
+    logger.info(
+        f"距離による事前フィルタ: 徒歩圏 {len(walk_results)}件 / 範囲外 {len(rejected)}件 / "
+        f"要計算 {len(remaining)}件 (Route Matrix の要素 {saved_elements}件を節約)"
+    )
+    return remaining, walk_results, rejected
+
+
+def get_travel_info_batch(
+    destinations: list[tuple[str, float, float]],
+    origin_lat: float,
+    origin_lng: float,
+    cache_expiry_days: int = 90,
+    max_workers: int = 8,
+    rate_per_second: float = 5.0,
+) -> dict[str, dict]:
+    """複数の目的地の移動時間情報をまとめて取得する。
+
+    キャッシュミス分を Route Matrix API のチャンクに分け、最大 max_workers 並列で
+    問い合わせる。Matrix で得られなかった目的地は computeRoutes で1件ずつ補う。
+    API 呼び出しは rate_per_second で制限する。
+    結果はまとめて1回だけキャッシュに書き込む。
+    各エントリは compute_travel_time の結果に cached_at を付けたもの。
+    travel_time_minutes が null のキャッシュエントリは取得し直す。
+
+    Args:
+        destinations: (place_id, dest_lat, dest_lng) のリスト
+        origin_lat: 出発地の緯度
+        origin_lng: 出発地の経度
+        cache_expiry_days: キャッシュ有効期限（日）
+        max_workers: 並列数
+        rate_per_second: Routes API の1秒あたり最大呼び出し回数
+
+    Returns:
+        {place_id: travel_info_dict}（取得に失敗した place_id は含まない）
+    """
+    cache = _cache()
+
+    results: dict[str, dict] = {}
+    misses: list[tuple[str, float, float]] = []
+    for place_id, dest_lat, dest_lng in destinations:
+        entry = cache.get(place_id)
+        if _is_travel_cache_hit(entry, cache_expiry_days):
+            results[place_id] = entry
+        else:
+            misses.append((place_id, dest_lat, dest_lng))
+    metrics.record_cache("travel", hit=True, count=len(results))
+    metrics.record_cache("travel", hit=False, count=len(misses))
+
+    logger.info(
+        f"移動時間: キャッシュヒット {len(results)}件 / API対象 {len(misses)}件"
+        f" (並列数 {max_workers})"
+    )
+    if not misses:
+        return results
+
+    limiter = RateLimiter(rate_per_second)
+    chunks = [
+        misses[i:i + MATRIX_MAX_DESTINATIONS]
+        for i in range(0, len(misses), MATRIX_MAX_DESTINATIONS)
+    ]
+
+    def _compute_chunk(chunk: list[tuple[str, float, float]]) -> dict[str, dict]:
+        try:
+            return compute_travel_times_matrix(
+                origin_lat, origin_lng, chunk, rate_limiter=limiter,
+            )
+        except Exception as e:
+            logger.warning(f"  Route Matrix 失敗（1件ずつ再計算します）: {e}")
+            return {}
+
+    def _compute(dest: tuple[str, float, float]) -> dict | None:
+        place_id, dest_lat, dest_lng = dest
+        try:
+            return compute_travel_time(
+                origin_lat, origin_lng, dest_lat, dest_lng,
+                rate_limiter=limiter,
+            )
+        except Exception as e:
+            logger.warning(f"  移動時間取得失敗 ({place_id}): {e}")
+            return None
+
+    computed: dict[str, dict] = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        for chunk_result in executor.map(_compute_chunk, chunks):
+            computed.update(chunk_result)
+
+        # Matrix で得られなかった目的地だけ computeRoutes で1件ずつ再計算
+        leftovers = [dest for dest in misses if dest[0] not in computed]
+        if leftovers:
+            logger.info(f"  computeRoutes で再計算: {len(leftovers)}件")
+            for dest, result in zip(leftovers, executor.map(_compute, leftovers)):
+                if result is not None:
+                    computed[dest[0]] = result
+
+    logger.info(
+        f"  Route Matrix: {len(chunks)}リクエストで {len(misses) - len(leftovers)}件を取得"
+    )
+
+    cached_at = datetime.now(JST).isoformat()
+    for result in computed.values():
+        result["cached_at"] = cached_at
+
+    cache.put_many(computed)
+    results.update(computed)
+
+    # 入力順に並べ直して返す
+    return {
+        place_id: results[place_id]
+        for place_id, _, _ in destinations
+        if place_id in results
+    }
 
 
 def get_nearest_station(
     lat: float,
     lng: float,
     cache_expiry_days: int = 90,
+    reuse_radius_m: float = 0,
+    station_info_expiry_days: int = 365,
 ) -> str:
     """最寄り駅名（可能であれば路線名付き）を返す。
 
@@ -221,17 +548,41 @@ def get_nearest_station(
 
     Places API Nearby Search で駅を探し、
     editorialSummary から路線名を正規表現で抽出する。
-    結果は station_cache.json に "station:lat,lng" キーでキャッシュする。
-    """
-    cache_key = f"station:{round(lat, 4)},{round(lng, 4)}"
-    cache = _load_cache()
+    結果はキャッシュストアに "station:lat,lng" キーでキャッシュする。
 
-    if cache_key in cache:
-        entry = cache[cache_key]
+    ローカルの駅データセット（data/stations.csv）に 1km 以内の駅があれば
+    API を呼ばずにその駅を返す。見つからない場合のみ以下の API 経路を使う。
+
+    reuse_radius_m > 0 の場合、同じ座標キーがなくても半径 reuse_radius_m 以内に
+    過去の問い合わせ地点があれば、最も近い地点の結果を再利用する。
+
+    駅ごとの表示名と路線名は "station_id:<place id>" キーで
+    station_info_expiry_days 日キャッシュし、同じ駅の Place Details は再取得しない。
+    """
+    offline = get_locator().nearest(lat, lng, max_km=STATION_SEARCH_RADIUS_M / 1000)
+    if offline is not None:
+        metrics.record_cache("station", hit=True)
+        return format_station(offline["name"], offline["line"])
+
+    cache_key = f"{STATION_KEY_PREFIX}{round(lat, 4)},{round(lng, 4)}"
+    entry = _cache().get(cache_key)
+    if entry is not None:
         if _is_cache_valid(entry, cache_expiry_days):
             logger.debug(f"駅キャッシュヒット: {cache_key}")
+            metrics.record_cache("station", hit=True)
             return entry.get("name", "")
 
+    if reuse_radius_m > 0:
+        for distance_m, near_key in _station_index().within(lat, lng, reuse_radius_m):
+            near = _cache().get(near_key)
+            # 駅が見つからなかった地点の結果は流用しない
+            if near and near.get("name") and _is_cache_valid(near, cache_expiry_days):
+                logger.debug(f"駅キャッシュ近傍ヒット: {near_key} ({distance_m:.0f}m)")
+                metrics.record_cache("station", hit=True)
+                return near["name"]
+
+    metrics.record_cache("station", hit=False)
+
     # Step 1: 最寄り駅を検索
     headers = {
         "Content-Type": "application/json",
@@ -245,14 +596,14 @@ def get_nearest_station(
         "locationRestriction": {
             "circle": {
                 "center": {"latitude": lat, "longitude": lng},
-                "radius": 1000.0,
+                "radius": STATION_SEARCH_RADIUS_M,
             }
         },
         "languageCode": "ja",
     }
 
     try:
-        resp = requests.post(NEARBY_URL, json=body, headers=headers, timeout=30)
+        resp = http_client.post(NEARBY_URL, json=body, headers=headers, timeout=30)
         resp.raise_for_status()
         places = resp.json().get("places", [])
     except Exception as e:
@@ -260,7 +611,7 @@ def get_nearest_station(
         return ""
 
     if not places:
-        _cache_station(cache, cache_key, "")
+        _cache_station(cache_key, lat, lng, "")
         return ""
 
     first = places[0]
@@ -268,45 +619,69 @@ def get_nearest_station(
     station_name = dn.get("text", "") if isinstance(dn, dict) else str(dn)
     station_id = first.get("id", "")
 
-    # Step 2: editorialSummary から路線名を抽出
+    # Step 2: 路線名（駅 ID ごとのキャッシュ → editorialSummary の順）
     line_name = ""
     if station_id:
-        try:
-            detail_url = f"{PLACES_BASE_URL}/places/{station_id}"
-            detail_headers = {
-                "X-Goog-Api-Key": get_api_key(),
-                "X-Goog-FieldMask": "editorialSummary",
-            }
-            detail_resp = requests.get(
-                detail_url,
-                headers=detail_headers,
-                params={"languageCode": "ja"},
-                timeout=30,
-            )
-            detail_resp.raise_for_status()
-            summary_obj = detail_resp.json().get("editorialSummary", {})
-            summary_text = summary_obj.get("text", "") if isinstance(summary_obj, dict) else ""
-
-            # 路線名パターン: 主要な運行会社名 + 路線名
-            m = re.search(
-                r"((?:東京メトロ|都営|JR|東急|京急|小田急|京王|西武|東武|相鉄|京成"
-                r"|つくばエクスプレス|ゆりかもめ|りんかい線|多摩モノレール)"
-                r"[^\s、。]{0,15}線)",
-                summary_text,
-            )
-            if m:
-                line_name = m.group(1)
-            time.sleep(0.2)
-        except Exception as e:
-            logger.debug(f"路線名取得失敗 ({station_name}): {e}")
-
-    result = f"{station_name}（{line_name}）" if line_name else station_name
-    _cache_station(cache, cache_key, result)
+        info_key = f"{STATION_ID_KEY_PREFIX}{station_id}"
+        info = _cache().get(info_key)
+        if info is not None and _is_cache_valid(info, station_info_expiry_days):
+            logger.debug(f"駅IDキャッシュヒット: {station_id}")
+            station_name = info.get("name") or station_name
+            line_name = info.get("line", "")
+        else:
+            fetched = _fetch_station_line(station_id, station_name)
+            if fetched is not None:
+                line_name = fetched
+                _cache().put(info_key, {
+                    "name": station_name,
+                    "line": line_name,
+                    "cached_at": datetime.now(JST).isoformat(),
+                })
+
+    result = format_station(station_name, line_name)
+    _cache_station(cache_key, lat, lng, result)
     logger.info(f"最寄り駅: {result}")
     return result
 
 
-def _cache_station(cache: dict, key: str, name: str) -> None:
-    """駅情報をキャッシュに保存する。"""
-    cache[key] = {"name": name, "cached_at": datetime.now(JST).isoformat()}
-    _save_cache(cache)
+def _fetch_station_line(station_id: str, station_name: str) -> str | None:
+    """駅の editorialSummary から路線名を抽出する。
+
+    Returns:
+        路線名（見つからなければ ""）。取得に失敗した場合は None。
+    """
+    try:
+        detail_url = f"{PLACES_BASE_URL}/places/{station_id}"
+        detail_headers = {
+            "X-Goog-Api-Key": get_api_key(),
+            "X-Goog-FieldMask": "editorialSummary",
+        }
+        detail_resp = http_client.get(
+            detail_url,
+            headers=detail_headers,
+            params={"languageCode": "ja"},
+            timeout=30,
+        )
+        detail_resp.raise_for_status()
+        summary_obj = detail_resp.json().get("editorialSummary", {})
+        summary_text = summary_obj.get("text", "") if isinstance(summary_obj, dict) else ""
+    except Exception as e:
+        logger.debug(f"路線名取得失敗 ({station_name}): {e}")
+        return None
+
+    # 路線名パターン: 主要な運行会社名 + 路線名
+    m = re.search(
+        r"((?:東京メトロ|都営|JR|東急|京急|小田急|京王|西武|東武|相鉄|京成"
+        r"|つくばエクスプレス|ゆりかもめ|りんかい線|多摩モノレール)"
+        r"[^\s、。]{0,15}線)",
+        summary_text,
+    )
+    return m.group(1) if m else ""
+
+
+def _cache_station(key: str, lat: float, lng: float, name: str) -> None:
+    """駅情報をキャッシュに保存し、空間インデックスに登録する。"""
+    is_new = key not in _cache()
+    _cache().put(key, {"name": name, "cached_at": datetime.now(JST).isoformat()})
+    if is_new:
+        _station_index().insert(lat, lng, key)
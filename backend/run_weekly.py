@@ -2,15 +2,28 @@
 
 毎週金曜日に GitHub Actions から実行される。
 手動実行: python -m backend.run_weekly
+途中から再開: python -m backend.run_weekly --resume
 """
+import argparse
 import logging
 import sys
-import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
+from backend import metrics
+from backend.checkpoint import RunCheckpoint, run_id_for
 from backend.config import load_config, DATA_DIR, FRONTEND_DATA_DIR, PHOTOS_DIR
-from backend.places_client import search_all_restaurants, get_place_details
-from backend.routes_client import get_travel_info, get_nearest_station
+from backend.places_client import (
+    dedupe_places,
+    get_place_details,
+    search_restaurants_by_query,
+)
+from backend.place_catalog import load_catalog_places, select_refresh_queries, update_catalog
+from backend.routes_client import (
+    get_travel_info_batch,
+    get_nearest_station,
+    prefilter_destinations,
+)
 from backend.recommender import (
     load_visited_ids,
     load_recent_history,
@@ -19,9 +32,12 @@ from backend.recommender import (
     filter_candidates,
     weighted_random_pick,
 )
-from backend.photo_downloader import download_photos
+from backend.photo_downloader import download_photos, shutdown_compress_pool
+from backend.photo_gc import sweep_unreferenced_photos
 from backend.site_generator import (
     generate_current_json,
+    generate_frontend_indexes,
+    is_week_published,
     update_archive,
     update_history,
     sync_visited_to_frontend,
@@ -82,259 +98,276 @@ PRIMARY_TYPE_JA: dict[str, str] = {
 }
 
 
-def main() -> int:
-    """メインパイプラインを実行する。"""
+def main(argv: list[str] | None = None) -> int:
+    """メインパイプラインを実行する。
+
+    各ステップの出力はチェックポイントに保存する。--resume を付けると
+    同じ週の実行で完了済みのステップを飛ばし、続きから実行する。
+    ステップごとの計測レポートを data/metrics/ に出力する（失敗時も出力する）。
+    """
+    parser = argparse.ArgumentParser(description="週次グルメレコメンデーション")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="同じ週の中断した実行を完了済みのステップの続きから再開する",
+    )
+    args = parser.parse_args(argv)
+
+    metrics.reset()
+    try:
+        return _run_pipeline(args.resume)
+    finally:
+        # 途中で失敗した場合もそこまでの計測を残す
+        metrics.write_report()
+
+
+def _run_pipeline(resume: bool) -> int:
+    """10ステップのパイプライン本体。各ステップを metrics.stage で計測する。"""
     logger.info("=" * 60)
     logger.info("Tokyo Gourmet Recommender - 週次パイプライン開始")
     logger.info("=" * 60)
 
     # Step 1: 設定読み込み
-    logger.info("[Step 1/10] 設定読み込み")
-    config = load_config()
-    origin = config["origin"]
-    search_cfg = config["search"]
-    budget_cfg = config["budget"]
-    email_cfg = config["email"]
-    sheets_cfg = config["sheets"]
-    site_cfg = config["site"]
-    cache_cfg = config["cache"]
-    photos_cfg = config["photos"]
-
-    now = datetime.now(JST)
-    # 曜日の日本語マッピング
-    weekday_ja = ["月", "火", "水", "木", "金", "土", "日"]
-    week_label = f"{now.year}年{now.month}月{now.day}日（{weekday_ja[now.weekday()]}）"
-    generated_date = now.strftime("%Y-%m-%d")
+    with metrics.stage("01_config"):
+        logger.info("[Step 1/10] 設定読み込み")
+        config = load_config()
+        origin = config["origin"]
+        search_cfg = config["search"]
+        budget_cfg = config["budget"]
+        email_cfg = config["email"]
+        sheets_cfg = config["sheets"]
+        site_cfg = config["site"]
+        cache_cfg = config["cache"]
+        photos_cfg = config["photos"]
+        concurrency_cfg = config.get("concurrency", {})
+        rate_cfg = config.get("rate_limits", {})
+
+        checkpoint = RunCheckpoint(run_id_for(datetime.now(JST)), resume=resume)
+        # 再開時は最初の実行の日時（週ラベル・生成日）を引き継ぐ
+        if checkpoint.completed("01_run"):
+            now = datetime.fromisoformat(checkpoint.load("01_run")["now"])
+        else:
+            now = datetime.now(JST)
+            checkpoint.save("01_run", {"now": now.isoformat()})
+        # 曜日の日本語マッピング
+        weekday_ja = ["月", "火", "水", "木", "金", "土", "日"]
+        week_label = f"{now.year}年{now.month}月{now.day}日（{weekday_ja[now.weekday()]}）"
+        generated_date = now.strftime("%Y-%m-%d")
 
     # Step 2: 訪問済みレストランの読み込み
-    logger.info("[Step 2/10] 訪問済みレストラン読み込み")
-    visited_ids = merge_visited_sources(
-        spreadsheet_id=sheets_cfg.get("spreadsheet_id", ""),
-        worksheet_name=sheets_cfg.get("worksheet_name", "visited"),
-    )
-    recent_ids = load_recent_history(weeks=4)
-    logger.info(f"  訪問済み: {len(visited_ids)}件, 直近推薦済み: {len(recent_ids)}件")
-
-    # Step 3: レストラン検索
-    logger.info("[Step 3/10] レストラン検索 (Places API)")
-    candidates = search_all_restaurants(
-        queries=search_cfg["queries"],
-        lat=origin["lat"],
-        lng=origin["lng"],
-        radius_meters=search_cfg["search_radius_meters"],
-        min_rating=search_cfg["min_rating"],
-    )
-    logger.info(f"  検索結果: {len(candidates)}件")
+    with metrics.stage("02_visited"):
+        logger.info("[Step 2/10] 訪問済みレストラン読み込み")
+        if checkpoint.completed("02_visited"):
+            saved = checkpoint.load("02_visited")
+            visited_ids, recent_ids = set(saved["visited_ids"]), set(saved["recent_ids"])
+        else:
+            visited_ids = merge_visited_sources(
+                spreadsheet_id=sheets_cfg.get("spreadsheet_id", ""),
+                worksheet_name=sheets_cfg.get("worksheet_name", "visited"),
+            )
+            recent_ids = load_recent_history(weeks=4)
+            checkpoint.save("02_visited", {
+                "visited_ids": sorted(visited_ids),
+                "recent_ids": sorted(recent_ids),
+            })
+        logger.info(f"  訪問済み: {len(visited_ids)}件, 直近推薦済み: {len(recent_ids)}件")
+
+    # Step 3: レストラン検索（一部のクエリだけ検索し直し、候補はカタログ全体から）
+    with metrics.stage("03_search"):
+        logger.info("[Step 3/10] レストラン検索 (Places API)")
+        if checkpoint.completed("03_search"):
+            candidates = checkpoint.load("03_search")
+        else:
+            refresh_queries = select_refresh_queries(
+                search_cfg["queries"],
+                per_run=search_cfg.get("refresh_queries_per_run", 0),
+                now=now,
+            )
+            places_by_query = search_restaurants_by_query(
+                queries=refresh_queries,
+                lat=origin["lat"],
+                lng=origin["lng"],
+                radius_meters=search_cfg["search_radius_meters"],
+                min_rating=search_cfg["min_rating"],
+                max_workers=concurrency_cfg.get("search_workers", 6),
+                rate_per_second=rate_cfg.get("places_per_second", 5),
+            )
+            logger.info(f"  検索結果: {len(dedupe_places(places_by_query))}件")
+            update_catalog(places_by_query, now=now)
+            candidates = load_catalog_places(
+                now=now,
+                max_age_days=search_cfg.get("catalog_max_age_days", 60),
+                min_rating=search_cfg["min_rating"],
+            )
+            checkpoint.save("03_search", candidates)
+        logger.info(f"  候補（カタログ）: {len(candidates)}件")
 
-    if not candidates:
-        logger.error("候補が0件です。検索条件を緩和してください。")
-        return 1
+        if not candidates:
+            logger.error("候補が0件です。検索条件を緩和してください。")
+            return 1
 
     # Step 4: 移動時間の計算
-    logger.info("[Step 4/10] 移動時間計算 (Routes API)")
-    travel_data = {}
-    for place in candidates:
-        place_id = place.get("id", "")
-        location = place.get("location", {})
-        dest_lat = location.get("latitude")
-        dest_lng = location.get("longitude")
-
-        if not (place_id and dest_lat and dest_lng):
-            continue
-
-        # 訪問済み・直近推薦済みはスキップ（後でフィルタされるため）
-        if place_id in visited_ids or place_id in recent_ids:
-            continue
-
-        try:
-            travel_data[place_id] = get_travel_info(
-                place_id=place_id,
+    with metrics.stage("04_travel"):
+        logger.info("[Step 4/10] 移動時間計算 (Routes API)")
+        if checkpoint.completed("04_travel"):
+            saved = checkpoint.load("04_travel")
+            candidates, travel_data = saved["candidates"], saved["travel_data"]
+        else:
+            destinations = []
+            for place in candidates:
+                place_id = place.get("id", "")
+                location = place.get("location", {})
+                dest_lat = location.get("latitude")
+                dest_lng = location.get("longitude")
+
+                if not (place_id and dest_lat and dest_lng):
+                    continue
+
+                # 訪問済み・直近推薦済みはスキップ（後でフィルタされるため）
+                if place_id in visited_ids or place_id in recent_ids:
+                    continue
+
+                destinations.append((place_id, dest_lat, dest_lng))
+
+            # 直線距離だけで判定できるものは Routes API を呼ばない
+            destinations, travel_data, out_of_range = prefilter_destinations(
+                destinations=destinations,
                 origin_lat=origin["lat"],
                 origin_lng=origin["lng"],
-                dest_lat=dest_lat,
-                dest_lng=dest_lng,
+                max_travel_minutes=search_cfg["max_travel_minutes"],
                 cache_expiry_days=cache_cfg["travel_time_expiry_days"],
             )
-        except Exception as e:
-            logger.warning(f"  移動時間取得失敗 ({place_id}): {e}")
+            candidates = [c for c in candidates if c.get("id", "") not in out_of_range]
 
-    logger.info(f"  移動時間取得: {len(travel_data)}件")
+            travel_data |= get_travel_info_batch(
+                destinations=destinations,
+                origin_lat=origin["lat"],
+                origin_lng=origin["lng"],
+                cache_expiry_days=cache_cfg["travel_time_expiry_days"],
+                max_workers=concurrency_cfg.get("travel_workers", 8),
+                rate_per_second=rate_cfg.get("routes_per_second", 5),
+            )
+            checkpoint.save("04_travel", {"candidates": candidates, "travel_data": travel_data})
+
+        logger.info(f"  移動時間取得: {len(travel_data)}件")
 
     # Step 5: フィルタリング
-    logger.info("[Step 5/10] 候補フィルタリング")
-    filtered = filter_candidates(
-        places=candidates,
-        visited_ids=visited_ids,
-        recent_ids=recent_ids,
-        min_reviews=search_cfg["min_reviews"],
-        max_travel_minutes=search_cfg["max_travel_minutes"],
-        travel_info=travel_data,
-    )
+    with metrics.stage("05_filter"):
+        logger.info("[Step 5/10] 候補フィルタリング")
+        if checkpoint.completed("05_filter"):
+            filtered = checkpoint.load("05_filter")
+        else:
+            filtered = filter_candidates(
+                places=candidates,
+                visited_ids=visited_ids,
+                recent_ids=recent_ids,
+                min_reviews=search_cfg["min_reviews"],
+                max_travel_minutes=search_cfg["max_travel_minutes"],
+                travel_info=travel_data,
+            )
+            checkpoint.save("05_filter", filtered)
 
-    if not filtered:
-        logger.error("フィルタ後の候補が0件です。条件を緩和してください。")
-        return 1
+        if not filtered:
+            logger.error("フィルタ後の候補が0件です。条件を緩和してください。")
+            return 1
 
     # Step 6: ランダム選定
-    logger.info("[Step 6/10] ランダム選定")
-    selected = weighted_random_pick(filtered, search_cfg["pick_count"])
-    logger.info(f"  選定: {len(selected)}件")
+    with metrics.stage("06_select"):
+        logger.info("[Step 6/10] ランダム選定")
+        if checkpoint.completed("06_select"):
+            selected = checkpoint.load("06_select")
+        else:
+            selected = weighted_random_pick(filtered, search_cfg["pick_count"])
+            checkpoint.save("06_select", selected)
+        logger.info(f"  選定: {len(selected)}件")
 
     # Step 7: 詳細情報取得 + 予算分類
-    logger.info("[Step 7/10] 詳細情報取得 (Place Details)")
-    restaurants = []
-    for place in selected:
-        place_id = place.get("id", "")
-        try:
-            details = get_place_details(place_id)
-        except Exception as e:
-            logger.warning(f"  詳細取得失敗 ({place_id}): {e}")
-            details = place  # 検索結果をフォールバック
-
-        # 予算分類
-        budget_info = classify_budget(details, budget_cfg)
-        # 朝昼/夜のどちらかを主要予算として設定（デフォルトは朝昼）
-        primary_budget = budget_info["morning_lunch"]
-
-        # 移動情報
-        travel = travel_data.get(place_id, {})
-
-        # 写真ダウンロード
-        photos = details.get("photos", [])
-        saved_photos = []
-        if photos:
-            saved_photos = download_photos(
-                place_id=place_id,
-                photos=photos,
-                max_photos=photos_cfg["max_per_restaurant"],
-                max_width=photos_cfg["max_width_px"],
-                target_width=photos_cfg.get("target_width_px", 640),
-                jpeg_quality=photos_cfg.get("jpeg_quality", 65),
+    with metrics.stage("07_enrich"):
+        logger.info("[Step 7/10] 詳細情報取得 (Place Details)")
+        restaurants = None
+        if checkpoint.completed("07_enrich"):
+            restaurants = checkpoint.load("07_enrich")
+            # 前回の実行で保存した写真が残っていなければ（CI の新しいチェックアウトなど）取得し直す
+            missing = _missing_photos(restaurants)
+            if missing:
+                logger.warning(f"  チェックポイントの写真 {missing}件が見つからないため取得し直します")
+                restaurants = None
+        if restaurants is None:
+            restaurants = enrich_restaurants(
+                selected,
+                origin=origin,
+                travel_data=travel_data,
+                budget_cfg=budget_cfg,
+                photos_cfg=photos_cfg,
+                cache_cfg=cache_cfg,
+                max_workers=concurrency_cfg.get("enrich_workers", 4),
             )
-
-        # 営業時間
-        opening_hours = details.get("regularOpeningHours", {})
-        weekday_text = opening_hours.get("weekdayDescriptions", [])
-
-        # レビューからおすすめメニューを抽出
-        menu_info = _extract_menu_from_reviews(details.get("reviews", []))
-        recommended_menu = menu_info["text"] if menu_info else None
-        recommended_menu_rating = menu_info["rating"] if menu_info else None
-
-        display_name = details.get("displayName", {})
-        name = display_name.get("text", "") if isinstance(display_name, dict) else str(display_name)
-
-        # ジャンル: primaryTypeDisplayName（日本語） → PRIMARY_TYPE_JA マッピング の順で取得
-        primary_type_display = details.get("primaryTypeDisplayName", {})
-        if isinstance(primary_type_display, dict):
-            genre = primary_type_display.get("text", "")
-        else:
-            genre = ""
-        if not genre:
-            genre = PRIMARY_TYPE_JA.get(details.get("primaryType", ""), "")
-
-        # 最寄り駅
-        location = details.get("location", {})
-        r_lat = location.get("latitude")
-        r_lng = location.get("longitude")
-        nearest_station = ""
-        if r_lat and r_lng:
-            try:
-                nearest_station = get_nearest_station(
-                    r_lat, r_lng,
-                    cache_expiry_days=cache_cfg.get("travel_time_expiry_days", 90),
-                )
-            except Exception as e:
-                logger.warning(f"  最寄り駅取得失敗 ({place_id}): {e}")
-
-        restaurant = {
-            "place_id": place_id,
-            "name": name,
-            "rating": details.get("rating"),
-            "user_rating_count": details.get("userRatingCount", 0),
-            "budget_tier": primary_budget["tier"],
-            "budget_label": primary_budget["label"],
-            "budget_icon": primary_budget["icon"],
-            "budget_morning_lunch": budget_info["morning_lunch"],
-            "budget_dinner": budget_info["dinner"],
-            "price_range": estimate_price_range(
-                details.get("priceLevel", "PRICE_LEVEL_MODERATE"),
-                "morning_lunch",
-                budget_cfg,
-            ),
-            "price_range_dinner": estimate_price_range(
-                details.get("priceLevel", "PRICE_LEVEL_MODERATE"),
-                "dinner",
-                budget_cfg,
-            ),
-            "address": details.get("formattedAddress", ""),
-            "travel_time_minutes": travel.get("travel_time_minutes"),
-            "travel_cost_yen": travel.get("travel_cost_yen"),
-            "travel_bicycle_minutes": travel.get("travel_bicycle_minutes"),
-            "travel_summary": travel.get("travel_summary", ""),
-            "reservable": details.get("reservable"),
-            "opening_hours": weekday_text,
-            "photos": saved_photos,
-            "google_maps_url": details.get("googleMapsUri", ""),
-            "route_url": _build_route_url(
-                origin["lat"],
-                origin["lng"],
-                r_lat,
-                r_lng,
-                place_id,
-                travel.get("travel_bicycle_minutes"),
-            ),
-            "website": details.get("websiteUri", ""),
-            "phone": details.get("nationalPhoneNumber", ""),
-            "primary_type": details.get("primaryType", ""),
-            "genre": genre,
-            "nearest_station": nearest_station,
-            "recommended_menu": recommended_menu,
-            "recommended_menu_rating": recommended_menu_rating,
-            "payment_methods": _extract_payment_methods(details),
-        }
-        restaurants.append(restaurant)
-        time.sleep(0.3)
-
-    logger.info(f"  レストラン情報構築完了: {len(restaurants)}件")
+            checkpoint.save("07_enrich", restaurants)
+        logger.info(f"  レストラン情報構築完了: {len(restaurants)}件")
 
     # Step 8: JSON生成
-    logger.info("[Step 8/10] JSONデータ生成")
-    current_data = generate_current_json(restaurants, week_label)
-    update_archive(current_data)
-    update_history(current_data)
-    sync_visited_to_frontend()
+    with metrics.stage("08_publish"):
+        logger.info("[Step 8/10] JSONデータ生成")
+        # 生成日時は書き出す前にチェックポイントに保存し、再開時も同じ週として書き出す
+        # （アーカイブ・履歴は同じ generated_at の週を二重に追加しない）
+        if checkpoint.completed("08_generated_at"):
+            generated_at = checkpoint.load("08_generated_at")["generated_at"]
+        else:
+            generated_at = datetime.now(JST).isoformat()
+            checkpoint.save("08_generated_at", {"generated_at": generated_at})
+        # 完了済みでも、書き出したファイルが残っていない（前回の実行の出力が
+        # コミットされず失われた）場合はやり直す
+        published = checkpoint.completed("08_publish") and is_week_published(generated_at)
+        if checkpoint.completed("08_publish") and not published:
+            logger.warning("  前回の実行で書き出したデータが見つからないため書き出し直します")
+        if not published:
+            current_data = generate_current_json(restaurants, week_label, generated_at=generated_at)
+            update_archive(current_data)
+            update_history(current_data)
+            sync_visited_to_frontend()
+            generate_frontend_indexes(page_weeks=site_cfg.get("archive_page_weeks", 4))
+            if photos_cfg.get("gc_enabled", True):
+                sweep_unreferenced_photos()
+            checkpoint.save("08_publish", {"generated_at": current_data["generated_at"]})
 
     # Step 9: メール送信
-    logger.info("[Step 9/10] メール送信")
-    recipients = email_cfg.get("recipients") or []
-    if isinstance(recipients, str):
-        recipients = [recipients]
-    if recipients:
-        site_url = site_cfg.get("base_url", "")
-        subject = email_cfg["subject_template"].format(date=week_label)
-        html_body = render_email(restaurants, week_label, site_url)
-        for recipient in recipients:
-            success = send_email(
-                to=recipient,
-                subject=subject,
-                html_body=html_body,
-                sender=email_cfg.get("sender", ""),
-            )
-            if not success:
-                logger.warning(f"メール送信に失敗しました: {recipient}")
-    else:
-        logger.warning("メール送信先が未設定です (config.yaml: email.recipients)")
+    with metrics.stage("09_email"):
+        logger.info("[Step 9/10] メール送信")
+        # 再開時に同じメールを二重に送らない
+        if not checkpoint.completed("09_email"):
+            recipients = email_cfg.get("recipients") or []
+            if isinstance(recipients, str):
+                recipients = [recipients]
+            if recipients:
+                site_url = site_cfg.get("base_url", "")
+                subject = email_cfg["subject_template"].format(date=week_label)
+                html_body = render_email(restaurants, week_label, site_url)
+                for recipient in recipients:
+                    success = send_email(
+                        to=recipient,
+                        subject=subject,
+                        html_body=html_body,
+                        sender=email_cfg.get("sender", ""),
+                    )
+                    if not success:
+                        logger.warning(f"メール送信に失敗しました: {recipient}")
+            else:
+                logger.warning("メール送信先が未設定です (config.yaml: email.recipients)")
+            checkpoint.save("09_email", {"recipients": recipients})
 
     # Step 10: Sheets同期
-    logger.info("[Step 10/10] Google Sheets 同期")
-    if sheets_cfg.get("spreadsheet_id"):
-        sync_recommendations_to_sheet(
-            spreadsheet_id=sheets_cfg["spreadsheet_id"],
-            restaurants=restaurants,
-            generated_date=generated_date,
-            worksheet_name=sheets_cfg.get("worksheet_name", "visited"),
-        )
+    with metrics.stage("10_sheets"):
+        logger.info("[Step 10/10] Google Sheets 同期")
+        if sheets_cfg.get("spreadsheet_id"):
+            sync_recommendations_to_sheet(
+                spreadsheet_id=sheets_cfg["spreadsheet_id"],
+                restaurants=restaurants,
+                generated_date=generated_date,
+                worksheet_name=sheets_cfg.get("worksheet_name", "visited"),
+            )
+
+    # 最後まで完了したらチェックポイントは不要
+    checkpoint.clear()
 
     logger.info("=" * 60)
     logger.info("パイプライン完了!")
@@ -345,6 +378,209 @@ def main() -> int:
     return 0
 
 
+def enrich_restaurants(
+    selected: list[dict],
+    origin: dict,
+    travel_data: dict,
+    budget_cfg: dict,
+    photos_cfg: dict,
+    cache_cfg: dict,
+    max_workers: int = 4,
+) -> list[dict]:
+    """選定したレストランの詳細・写真・最寄り駅を並列に取得して表示用データを組み立てる。
+
+    レストラン単位で最大 max_workers 並列に処理し、各レストラン内でも
+    最寄り駅の検索を詳細取得・写真ダウンロードと並行して行う。
+    返り値は selected と同じ順序。
+    """
+    workers = max(1, max_workers)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as station_executor, \
+                ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(
+                lambda place: _enrich_restaurant(
+                    place,
+                    origin=origin,
+                    travel_data=travel_data,
+                    budget_cfg=budget_cfg,
+                    photos_cfg=photos_cfg,
+                    cache_cfg=cache_cfg,
+                    station_executor=station_executor,
+                ),
+                selected,
+            ))
+    finally:
+        shutdown_compress_pool()
+
+
+def _enrich_restaurant(
+    place: dict,
+    origin: dict,
+    travel_data: dict,
+    budget_cfg: dict,
+    photos_cfg: dict,
+    cache_cfg: dict,
+    station_executor: ThreadPoolExecutor,
+) -> dict:
+    """1件分のレストラン表示用データを組み立てる。"""
+    place_id = place.get("id", "")
+    station_expiry_days = cache_cfg.get("travel_time_expiry_days", 90)
+    station_radius_m = cache_cfg.get("station_reuse_radius_m", 0)
+    station_info_expiry_days = cache_cfg.get("station_info_expiry_days", 365)
+
+    # 最寄り駅は検索結果の座標だけで引けるので、詳細取得と並行して開始する
+    station_future = None
+    search_location = place.get("location", {})
+    if search_location.get("latitude") and search_location.get("longitude"):
+        station_future = station_executor.submit(
+            get_nearest_station,
+            search_location["latitude"],
+            search_location["longitude"],
+            cache_expiry_days=station_expiry_days,
+            reuse_radius_m=station_radius_m,
+            station_info_expiry_days=station_info_expiry_days,
+        )
+
+    try:
+        details = get_place_details(
+            place_id,
+            stable_ttl_days=cache_cfg.get("details_stable_days", 180),
+            volatile_ttl_days=cache_cfg.get("details_volatile_days", 7),
+        )
+    except Exception as e:
+        logger.warning(f"  詳細取得失敗 ({place_id}): {e}")
+        details = place  # 検索結果をフォールバック
+
+    # 予算分類
+    budget_info = classify_budget(details, budget_cfg)
+    # 朝昼/夜のどちらかを主要予算として設定（デフォルトは朝昼）
+    primary_budget = budget_info["morning_lunch"]
+
+    # 移動情報
+    travel = travel_data.get(place_id, {})
+
+    # 写真ダウンロード
+    photos = details.get("photos", [])
+    saved_photos = []
+    if photos:
+        saved_photos = download_photos(
+            place_id=place_id,
+            photos=photos,
+            max_photos=photos_cfg["max_per_restaurant"],
+            max_width=photos_cfg["max_width_px"],
+            target_width=photos_cfg.get("target_width_px", 640),
+            jpeg_quality=photos_cfg.get("jpeg_quality", 65),
+            fetch_workers=photos_cfg.get("fetch_workers", 4),
+            compress_workers=photos_cfg.get("compress_workers", 0),
+            variant_widths=photos_cfg.get("variant_widths", []),
+            variant_formats=photos_cfg.get("variant_formats", []),
+            variant_quality={
+                "webp": photos_cfg.get("webp_quality", 60),
+                "avif": photos_cfg.get("avif_quality", 50),
+            },
+            encoder_options={
+                "webp": {"method": photos_cfg.get("webp_method", 4)},
+                "avif": {"speed": photos_cfg.get("avif_speed", 8)},
+            },
+        )
+
+    # 営業時間
+    opening_hours = details.get("regularOpeningHours", {})
+    weekday_text = opening_hours.get("weekdayDescriptions", [])
+
+    # レビューからおすすめメニューを抽出
+    menu_info = _extract_menu_from_reviews(details.get("reviews", []))
+    recommended_menu = menu_info["text"] if menu_info else None
+    recommended_menu_rating = menu_info["rating"] if menu_info else None
+
+    display_name = details.get("displayName", {})
+    name = display_name.get("text", "") if isinstance(display_name, dict) else str(display_name)
+
+    # ジャンル: primaryTypeDisplayName（日本語） → PRIMARY_TYPE_JA マッピング の順で取得
+    primary_type_display = details.get("primaryTypeDisplayName", {})
+    if isinstance(primary_type_display, dict):
+        genre = primary_type_display.get("text", "")
+    else:
+        genre = ""
+    if not genre:
+        genre = PRIMARY_TYPE_JA.get(details.get("primaryType", ""), "")
+
+    # 最寄り駅
+    location = details.get("location", {})
+    r_lat = location.get("latitude")
+    r_lng = location.get("longitude")
+    nearest_station = ""
+    try:
+        if station_future is not None:
+            nearest_station = station_future.result()
+        elif r_lat and r_lng:
+            nearest_station = get_nearest_station(
+                r_lat, r_lng,
+                cache_expiry_days=station_expiry_days,
+                reuse_radius_m=station_radius_m,
+                station_info_expiry_days=station_info_expiry_days,
+            )
+    except Exception as e:
+        logger.warning(f"  最寄り駅取得失敗 ({place_id}): {e}")
+
+    return {
+        "place_id": place_id,
+        "name": name,
+        "rating": details.get("rating"),
+        "user_rating_count": details.get("userRatingCount", 0),
+        "budget_tier": primary_budget["tier"],
+        "budget_label": primary_budget["label"],
+        "budget_icon": primary_budget["icon"],
+        "budget_morning_lunch": budget_info["morning_lunch"],
+        "budget_dinner": budget_info["dinner"],
+        "price_range": estimate_price_range(
+            details.get("priceLevel", "PRICE_LEVEL_MODERATE"),
+            "morning_lunch",
+            budget_cfg,
+        ),
+        "price_range_dinner": estimate_price_range(
+            details.get("priceLevel", "PRICE_LEVEL_MODERATE"),
+            "dinner",
+            budget_cfg,
+        ),
+        "address": details.get("formattedAddress", ""),
+        "travel_time_minutes": travel.get("travel_time_minutes"),
+        "travel_cost_yen": travel.get("travel_cost_yen"),
+        "travel_bicycle_minutes": travel.get("travel_bicycle_minutes"),
+        "travel_summary": travel.get("travel_summary", ""),
+        "reservable": details.get("reservable"),
+        "opening_hours": weekday_text,
+        "photos": saved_photos,
+        "google_maps_url": details.get("googleMapsUri", ""),
+        "route_url": _build_route_url(
+            origin["lat"],
+            origin["lng"],
+            r_lat,
+            r_lng,
+            place_id,
+            travel.get("travel_bicycle_minutes"),
+        ),
+        "website": details.get("websiteUri", ""),
+        "phone": details.get("nationalPhoneNumber", ""),
+        "primary_type": details.get("primaryType", ""),
+        "genre": genre,
+        "nearest_station": nearest_station,
+        "recommended_menu": recommended_menu,
+        "recommended_menu_rating": recommended_menu_rating,
+        "payment_methods": _extract_payment_methods(details),
+    }
+
+
+def _missing_photos(restaurants: list[dict]) -> int:
+    """表示用データが参照している写真（バリアントを含む）のうち、存在しないファイルの数。"""
+    missing = 0
+    for r in restaurants:
+        for photo in r.get("photos", []):
+            names = [photo["filename"], *(v["filename"] for v in photo.get("variants", []))]
+            missing += sum(1 for name in names if not (PHOTOS_DIR / name).exists())
+    return missing
+
+
 def _build_route_url(
     origin_lat: float,
     origin_lng: float,
@@ -7,19 +7,35 @@ from datetime import datetime, timedelta, timezone
 from backend.config import (
     DATA_DIR, FRONTEND_DATA_DIR, VISITED_FILE,
 )
+from backend.history_index import add_week, load_history_index, save_history_index
 
 logger = logging.getLogger(__name__)
 
 JST = timezone(timedelta(hours=9))
 
+# 週ごとのアーカイブの保存先と保持週数
+ARCHIVE_DIR = FRONTEND_DATA_DIR / "archive"
+ARCHIVE_MAX_WEEKS = 52
+ARCHIVE_PAGES_FILE = ARCHIVE_DIR / "pages.json"
+
+# 管理ページのカタログに載せる項目
+CATALOG_FIELDS = [
+    "place_id", "name", "rating", "user_rating_count",
+    "budget_icon", "budget_label", "google_maps_url",
+]
+
 
 def generate_current_json(
     restaurants: list[dict],
     week_label: str,
+    generated_at: str | None = None,
 ) -> dict:
-    """今週のおすすめ JSON を生成する。"""
+    """今週のおすすめ JSON を生成する。
+
+    generated_at を渡すとその日時で生成する（再開時に同じ週として書き出し直すため）。
+    """
     data = {
-        "generated_at": datetime.now(JST).isoformat(),
+        "generated_at": generated_at or datetime.now(JST).isoformat(),
         "week_label": week_label,
         "restaurants": restaurants,
     }
@@ -33,28 +49,154 @@ def generate_current_json(
     return data
 
 
-def update_archive(current_data: dict) -> None:
-    """アーカイブ JSON に今週分を追記する。"""
-    archive_path = FRONTEND_DATA_DIR / "archive.json"
+def _week_id(generated_at: str) -> str:
+    """generated_at から週シャードの ID（例: "2026-07-24_143903"）を作る。"""
+    return datetime.fromisoformat(generated_at).strftime("%Y-%m-%d_%H%M%S")
+
+
+def _load_archive_index() -> list[dict]:
+    """アーカイブの索引（新しい順の週一覧）を読み込む。"""
     try:
-        with open(archive_path, "r", encoding="utf-8") as f:
-            archive = json.load(f)
+        with open(ARCHIVE_DIR / "index.json", "r", encoding="utf-8") as f:
+            return json.load(f).get("weeks", [])
     except (FileNotFoundError, json.JSONDecodeError):
-        archive = {"weeks": []}
+        return []
+
+
+def _save_archive_index(weeks: list[dict]) -> None:
+    with open(ARCHIVE_DIR / "index.json", "w", encoding="utf-8") as f:
+        json.dump({"weeks": weeks}, f, ensure_ascii=False, indent=2)
+
+
+def _write_week_shard(week: dict) -> dict:
+    """1週分をシャードファイルに書き出し、索引エントリを返す。"""
+    week_id = _week_id(week["generated_at"])
+    filename = f"{week_id}.json"
+    with open(ARCHIVE_DIR / filename, "w", encoding="utf-8") as f:
+        json.dump(week, f, ensure_ascii=False, indent=2)
+    return {
+        "id": week_id,
+        "generated_at": week["generated_at"],
+        "week_label": week["week_label"],
+        "file": filename,
+        "restaurant_count": len(week.get("restaurants", [])),
+    }
+
+
+def _migrate_monolithic_archive() -> None:
+    """旧形式の archive.json があれば週ごとのシャードに分割して削除する。"""
+    legacy_path = FRONTEND_DATA_DIR / "archive.json"
+    if not legacy_path.exists() or (ARCHIVE_DIR / "index.json").exists():
+        return
+    try:
+        with open(legacy_path, "r", encoding="utf-8") as f:
+            legacy = json.load(f)
+    except json.JSONDecodeError as e:
+        logger.warning(f"archive.json の読み込みに失敗したため移行しません: {e}")
+        return
+
+    ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+    index = [_write_week_shard(week) for week in legacy.get("weeks", [])]
+    _save_archive_index(index)
+    legacy_path.unlink()
+    logger.info(f"archive.json を週ごとのファイルに分割: {len(index)}週分")
+
+
+def load_archive_weeks(limit: int | None = None) -> list[dict]:
+    """アーカイブの週データを新しい順に読み込む。"""
+    _migrate_monolithic_archive()
+    weeks = []
+    for entry in _load_archive_index()[:limit]:
+        try:
+            with open(ARCHIVE_DIR / entry["file"], "r", encoding="utf-8") as f:
+                weeks.append(json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            logger.warning(f"アーカイブ週の読み込み失敗 ({entry['file']}): {e}")
+    return weeks
+
+
+def load_archive_weeks_strict() -> list[dict] | None:
+    """アーカイブの全週を読み込む。1週でも読めなければ None を返す。
+
+    写真の削除のように、読み落とした週がそのままデータの消失につながる処理で使う。
+    アーカイブディレクトリ自体がない（まだ1週もない）場合だけは空リストを返す。
+    """
+    _migrate_monolithic_archive()
+    if not ARCHIVE_DIR.exists():
+        return []
+    try:
+        with open(ARCHIVE_DIR / "index.json", "r", encoding="utf-8") as f:
+            index = json.load(f)["weeks"]
+    except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError) as e:
+        logger.warning(f"アーカイブの索引を読み込めません: {e}")
+        return None
+
+    weeks = []
+    for entry in index:
+        try:
+            with open(ARCHIVE_DIR / entry["file"], "r", encoding="utf-8") as f:
+                weeks.append(json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError) as e:
+            logger.warning(f"アーカイブ週を読み込めません ({entry.get('file', entry)}): {e}")
+            return None
+    if len(weeks) < len(index):
+        logger.warning(f"アーカイブ週の読み込み数が索引に足りません: {len(weeks)}/{len(index)}")
+        return None
+    return weeks
+
+
+def update_archive(current_data: dict) -> None:
+    """アーカイブに今週分を追加する。
+
+    週ごとに archive/{id}.json を書き出し、archive/index.json（新しい順の週一覧）を
+    更新する。既存の週ファイルは書き換えず、保持期間を過ぎた週のファイルだけ削除する。
+    """
+    _migrate_monolithic_archive()
+    ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
 
-    archive["weeks"].insert(0, current_data)
+    index = _load_archive_index()
+    week_id = _week_id(current_data["generated_at"])
+    if any(e["id"] == week_id and (ARCHIVE_DIR / e["file"]).exists() for e in index):
+        logger.info(f"アーカイブに追加済みの週のためスキップ: {week_id}")
+        return
+    entry = _write_week_shard(current_data)
+    index = [e for e in index if e["id"] != entry["id"]]
+    index.insert(0, entry)
 
     # 最大52週（1年分）保持
-    archive["weeks"] = archive["weeks"][:52]
+    for dropped in index[ARCHIVE_MAX_WEEKS:]:
+        (ARCHIVE_DIR / dropped["file"]).unlink(missing_ok=True)
+    index = index[:ARCHIVE_MAX_WEEKS]
 
-    with open(archive_path, "w", encoding="utf-8") as f:
-        json.dump(archive, f, ensure_ascii=False, indent=2)
+    _save_archive_index(index)
+    logger.info(f"アーカイブ更新: {entry['file']}（計{len(index)}週分）")
 
-    logger.info(f"archive.json 更新: 計{len(archive['weeks'])}週分")
+
+def is_week_published(generated_at: str) -> bool:
+    """generated_at の週が current.json・アーカイブ・history.json のすべてに書き出し済みか。"""
+    try:
+        with open(FRONTEND_DATA_DIR / "current.json", "r", encoding="utf-8") as f:
+            if json.load(f).get("generated_at") != generated_at:
+                return False
+        with open(DATA_DIR / "history.json", "r", encoding="utf-8") as f:
+            weeks = json.load(f).get("weeks", [])
+            if not weeks or weeks[0].get("generated_at") != generated_at:
+                return False
+    except (FileNotFoundError, json.JSONDecodeError):
+        return False
+
+    week_id = _week_id(generated_at)
+    return any(
+        e["id"] == week_id and (ARCHIVE_DIR / e["file"]).exists()
+        for e in _load_archive_index()
+    )
 
 
 def update_history(current_data: dict) -> None:
-    """永続的な履歴 JSON を更新する（data/ 配下）。"""
+    """永続的な履歴 JSON と推薦履歴の索引を更新する（data/ 配下）。"""
+    # 索引がなければ今週分を追加する前の history.json から作られる
+    index = load_history_index()
+
     history_path = DATA_DIR / "history.json"
     try:
         with open(history_path, "r", encoding="utf-8") as f:
@@ -62,7 +204,12 @@ def update_history(current_data: dict) -> None:
     except (FileNotFoundError, json.JSONDecodeError):
         history = {"weeks": []}
 
-    history["weeks"].insert(0, {
+    # 再開した実行で同じ週を二重に追加しない
+    if any(w.get("generated_at") == current_data["generated_at"] for w in history["weeks"]):
+        logger.info("history.json に追加済みの週のためスキップ")
+        return
+
+    week = {
         "generated_at": current_data["generated_at"],
         "week_label": current_data["week_label"],
         "restaurants": [
@@ -73,12 +220,102 @@ def update_history(current_data: dict) -> None:
             }
             for r in current_data["restaurants"]
         ],
-    })
+    }
+    history["weeks"].insert(0, week)
 
     with open(history_path, "w", encoding="utf-8") as f:
         json.dump(history, f, ensure_ascii=False, indent=2)
 
-    logger.info("history.json 更新")
+    add_week(index, week)
+    save_history_index(index)
+
+    logger.info(f"history.json 更新（索引: {len(index)}件）")
+
+
+def _write_restaurant_catalog(weeks: list[dict], visited_ids: set[str]) -> int:
+    """推薦済みレストランの重複なしカタログ（restaurants.json）を書き出す。
+
+    並びは最後に推薦された週の新しい順。first_recommended は最初に推薦された週。
+    """
+    catalog: dict[str, dict] = {}
+    # weeks は新しい順。古い週から反映して初回推薦週を決め、項目は最新の週で上書きする
+    for week in reversed(weeks):
+        for r in week.get("restaurants", []):
+            entry = catalog.get(r["place_id"])
+            if entry is None:
+                entry = {
+                    **{field: None for field in CATALOG_FIELDS},
+                    "first_recommended": week["week_label"],
+                    "first_recommended_at": week["generated_at"],
+                    "recommend_count": 0,
+                }
+                catalog[r["place_id"]] = entry
+            entry.update({field: r.get(field) for field in CATALOG_FIELDS})
+            entry["last_recommended_at"] = week["generated_at"]
+            entry["recommend_count"] += 1
+
+    restaurants = sorted(
+        catalog.values(),
+        key=lambda e: datetime.fromisoformat(e["last_recommended_at"]),
+        reverse=True,
+    )
+    for entry in restaurants:
+        entry["is_visited"] = entry["place_id"] in visited_ids
+
+    with open(FRONTEND_DATA_DIR / "restaurants.json", "w", encoding="utf-8") as f:
+        json.dump({
+            "restaurant_count": len(restaurants),
+            "visited_count": sum(1 for e in restaurants if e["is_visited"]),
+            "restaurants": restaurants,
+        }, f, ensure_ascii=False, indent=2)
+    return len(restaurants)
+
+
+def _write_archive_pages(index: list[dict], page_weeks: int) -> int:
+    """アーカイブのページ割り（archive/pages.json）を書き出す。
+
+    各ページは週ファイル（archive/{id}.json）の名前だけを持ち、本文はフロントエンドが
+    週ファイルから読む。ページは古い週から page_weeks 週ずつ区切る（1ページ目が最も古い）
+    ので、毎週の更新で変わるのは最新のページだけになる。
+    """
+    page_weeks = max(1, page_weeks)
+    files = [entry["file"] for entry in reversed(index)]
+    pages = [files[i:i + page_weeks] for i in range(0, len(files), page_weeks)]
+
+    # 週の本文を埋め込んでいた旧形式のページファイル
+    shutil.rmtree(ARCHIVE_DIR / "pages", ignore_errors=True)
+
+    ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(ARCHIVE_PAGES_FILE, "w", encoding="utf-8") as f:
+        json.dump({
+            "page_weeks": page_weeks,
+            "total_pages": max(1, len(pages)),
+            "total_weeks": len(files),
+            "pages": pages,
+        }, f, ensure_ascii=False, indent=2)
+    return max(1, len(pages))
+
+
+def generate_frontend_indexes(page_weeks: int = 4) -> None:
+    """アーカイブページ・管理ページ用の結合済みデータを生成する。
+
+    - restaurants.json: 推薦済みレストランの重複なしカタログ（初回推薦週・訪問済みフラグ付き）
+    - archive/pages.json: アーカイブの週ファイルを page_weeks 週ずつに分けたページ割り
+    """
+    weeks = load_archive_weeks()
+    try:
+        with open(VISITED_FILE, "r", encoding="utf-8") as f:
+            visited_ids = {v["place_id"] for v in json.load(f).get("visited", [])}
+    except (FileNotFoundError, json.JSONDecodeError):
+        visited_ids = set()
+
+    FRONTEND_DATA_DIR.mkdir(parents=True, exist_ok=True)
+    restaurant_count = _write_restaurant_catalog(weeks, visited_ids)
+    total_pages = _write_archive_pages(_load_archive_index(), page_weeks)
+    logger.info(
+        f"フロントエンド用索引生成: レストラン {restaurant_count}件, "
+        f"アーカイブ {total_pages}ページ"
+    )
 
 
 def sync_visited_to_frontend() -> None:
@@ -0,0 +1,90 @@
+"""ローカルの駅データセットによるオフライン最寄り駅検索
+
+data/stations.csv（name, line, lat, lng）を読み込み、
+NumPy で全駅への距離を一括計算して最寄り駅を返す。
+データセットは backend.build_station_dataset で生成する。
+ファイルがない場合は駅0件として動作し、呼び出し側は API にフォールバックする。
+"""
+import csv
+import logging
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from backend.config import STATIONS_FILE
+from backend.geo import haversine_km_many
+
+logger = logging.getLogger(__name__)
+
+STATION_FIELDS = ["name", "line", "lat", "lng"]
+
+_locator: "StationLocator | None" = None
+_locator_lock = threading.Lock()
+
+
+class StationLocator:
+    """駅データセットに対する最寄り駅検索。"""
+
+    def __init__(self, path: Path):
+        self.names: list[str] = []
+        self.lines: list[str] = []
+        lats: list[float] = []
+        lngs: list[float] = []
+
+        try:
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                for row in csv.DictReader(f):
+                    try:
+                        lat, lng = float(row["lat"]), float(row["lng"])
+                    except (KeyError, TypeError, ValueError):
+                        continue
+                    self.names.append(row.get("name", ""))
+                    self.lines.append(row.get("line", ""))
+                    lats.append(lat)
+                    lngs.append(lng)
+        except FileNotFoundError:
+            logger.warning(
+                f"駅データセットがありません: {path}（最寄り駅は Places API で検索します。"
+                "python -m backend.build_station_dataset で生成してください）"
+            )
+
+        self.lats = np.array(lats, dtype=np.float64)
+        self.lngs = np.array(lngs, dtype=np.float64)
+        if self.names:
+            logger.info(f"駅データセット読み込み: {len(self.names)}件")
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def nearest(self, lat: float, lng: float, max_km: float = 1.0) -> dict | None:
+        """max_km 以内で最も近い駅を返す。
+
+        Returns:
+            {"name": str, "line": str, "distance_km": float} または None
+        """
+        if not self.names:
+            return None
+        distances = haversine_km_many(lat, lng, self.lats, self.lngs)
+        i = int(np.argmin(distances))
+        if distances[i] > max_km:
+            return None
+        return {
+            "name": self.names[i],
+            "line": self.lines[i],
+            "distance_km": float(distances[i]),
+        }
+
+
+def get_locator() -> StationLocator:
+    """プロセス内で共有する StationLocator を返す（初回に読み込み）。"""
+    global _locator
+    with _locator_lock:
+        if _locator is None:
+            _locator = StationLocator(STATIONS_FILE)
+        return _locator
+
+
+def format_station(name: str, line: str) -> str:
+    """"大島駅（都営新宿線）" 形式の表示名を返す。"""
+    return f"{name}（{line}）" if line else name